@@ -1,10 +1,58 @@
+import io
+import os
+import time
+
 import streamlit as st
 import pandas as pd
-import altair as alt
+
+import perf
+import profiling
+from campaign_core import (
+    campaign_delta_view,
+    combined_hourly_view,
+    delta_table,
+    format_day,
+    format_days,
+    load_amazon_csv,
+    load_campaign_csv,
+    prepare_campaign_data,
+    select_filtered,
+)
+from charts import (
+    OTHER,
+    amazon_sales_chart,
+    campaign_change_chart,
+    campaign_change_metrics_chart,
+    campaign_chart_data,
+    campaign_metrics_chart_data,
+    combined_trend_chart,
+    combined_trend_metrics_chart,
+)
+from csv_schema import AMAZON_SCHEMA, CSV_ENGINE, spend_schema
+from data_sources import load_incremental_frame, load_remote_frame
+from perf_log import PERF_LOG_PATH, PerfLog, rerun_record
+from refresher import DatasetRefresher, snapshot_of
+from result_cache import ResultCache, selection_key
+from timestamps import AMAZON_DATE_FORMAT, SPEND_TIMESTAMP_FORMAT
 
 # ---- PAGE CONFIG ---- #
 st.set_page_config(page_title="Campaign Hourly Performance", layout="wide")
 
+# ---- PROFILING ---- #
+# "Profile next rerun" in the sidebar (or ?profile=1 in the URL, for every
+# rerun while present) runs the script under cProfile from here to the end.
+# A profiled run that was cut short left its profiler running; stop it first.
+profiling.discard(st.session_state.pop("running_profiler", None))
+profile_requested = st.session_state.pop("profile_next_run", False) or st.query_params.get("profile") == "1"
+profiler = profiling.start() if profile_requested else None
+if profiler is not None:
+    st.session_state["running_profiler"] = profiler
+
+# Stages of this run (loads on a cache miss, filtering) are timed for the
+# Performance panel; the metric sections fragment records its own.
+PERF_PANEL = os.environ.get("DASHBOARD_PERF_PANEL", "1") == "1"
+run_timings = perf.start_recording("full run")
+
 # ---- HEADER ---- #
 st.title("📊 Campaign Hourly Performance Dashboard")
 st.markdown("""
@@ -15,33 +63,6 @@ This dashboard helps you analyze how your marketing campaign metrics change **ho
 ✅ Metrics like Spend, CTR, ROAS, etc., are explained in plain English.
 """)
 
-# ---- INPUT FILE ---- #
-excel_url = "https://research.buywclothes.com/Ads_Automation_Reports/Amazon/spend_master.csv"
-uploaded_file = st.file_uploader("Upload Campaign CSV file", type=["csv"])
-
-# ---- AMAZON HOURLY SALE CSV ---- #
-Sales_url="https://research.buywclothes.com/marketing/amazon_sale_hourly.csv"
-amazon_file = st.sidebar.file_uploader("Upload Amazon Hourly Sales CSV", type=["csv"], key="amazon")
-
-amazon_hourly = None  # initialize
-
-if amazon_file:
-    amazon_df = pd.read_csv(amazon_file)
-else:
-    amazon_df= pd.read_csv(Sales_url, parse_dates=['Date'])
-    
-
-
-if uploaded_file:
-    df = pd.read_csv(uploaded_file, parse_dates=['timestamp'])
-else:
-    df = pd.read_csv(excel_url, parse_dates=['timestamp'])
-
-# ---- TIME FEATURES ---- #
-df['timestamp'] = pd.to_datetime(df['timestamp'])
-df['date'] = df['timestamp'].dt.date
-df['hour_index'] = df['timestamp'].dt.hour
-
 # ---- METRIC DESCRIPTIONS ---- #
 metric_descriptions = {
     "Spend": "How much money was spent on ads.",
@@ -57,142 +78,387 @@ metric_descriptions = {
     "vCTR": "Video Click-through Rate"
 }
 
-available_metrics = [m for m in metric_descriptions if m in df.columns]
-campaign_column = [col for col in df.columns if 'campaign' in col.lower()][0]
+# ---- CACHED LOADERS ---- #
+# Parsed frames are shared across reruns and sessions. A source is only re-read
+# when its TTL expires or a different file is uploaded.
+CACHE_TTL_SECONDS = int(os.environ.get("DASHBOARD_CACHE_TTL", "600"))
+# spend_master.csv is append-only; when set, a refresh only parses the new tail.
+INCREMENTAL_INGEST = os.environ.get("DASHBOARD_INCREMENTAL", "0") == "1"
 
-# ---- SIDEBAR FILTERS ---- #
-st.sidebar.header("🔎 Filters")
-selected_campaigns = st.sidebar.multiselect("Select Campaigns", sorted(df[campaign_column].unique()), default=sorted(df[campaign_column].unique()))
-selected_dates = st.sidebar.multiselect("Select Dates", sorted(df['date'].unique()), default=sorted(df['date'].unique()))
-selected_metrics = st.sidebar.multiselect("Select Metrics", available_metrics, default=["Spend"])
 
+def source_key(uploaded, url):
+    """Cache key for a source: the URL, or the upload's id for an uploaded file.
 
+    Streamlit gives every upload a new ``file_id``, so reruns with the same
+    upload hit the cache without reading the file again.
+    """
+    if uploaded is None:
+        return url
+    return "upload:" + uploaded.file_id
 
 
+def open_source(uploaded, url):
+    return url if uploaded is None else io.BytesIO(uploaded.getvalue())
 
-# Parse columns and clean
-amazon_df['Date'] = pd.to_datetime(amazon_df['Date'], dayfirst=True).dt.date
-amazon_df['Hour'] = pd.to_numeric(amazon_df['Hour'], errors='coerce')
-amazon_df['SP'] = pd.to_numeric(amazon_df['SP'], errors='coerce')
-amazon_hourly = amazon_df.groupby(['Date', 'Hour'])['SP'].sum().reset_index()
-amazon_hourly.rename(columns={'Hour': 'hour_index', 'Date': 'date'}, inplace=True)
 
-# ---- FILTERED DATA ---- #
-df_filtered = df[
-    (df[campaign_column].isin(selected_campaigns)) &
-    (df['date'].isin(selected_dates))
-].copy()
-
-# ---- BUDGET CALCULATIONS ---- #
-if 'Spend' in df.columns and 'Budget' in df.columns:
-    df_filtered['cumulative_spend'] = df_filtered.groupby([campaign_column, 'date'])['Spend'].cumsum()
-    df_filtered['budget_left'] = df_filtered['Budget'] - df_filtered['cumulative_spend']
-
-# ---- COMBINED HOURLY TREND ---- #
-st.subheader("🧮 Combined Hourly Trend (All Campaigns)")
-combined_hourly = df_filtered.groupby(['date', 'hour_index'])[selected_metrics].sum().reset_index()
-combined_hourly['date'] = combined_hourly['date'].astype(str)
-combined_hourly = combined_hourly.sort_values(by=['date', 'hour_index'])
-
-# Merge Amazon hourly SP if uploaded
-if amazon_hourly is not None:
-    amazon_hourly['date'] = amazon_hourly['date'].astype(str)
-    combined_hourly = pd.merge(combined_hourly, amazon_hourly, on=['date', 'hour_index'], how='left')
-
-
-# Calculate deltas
-for metric in selected_metrics:
-    combined_hourly[f"{metric}_delta"] = combined_hourly.groupby('date')[metric].diff()
-    combined_hourly[f"{metric}_delta"] = combined_hourly[f"{metric}_delta"].fillna(combined_hourly[metric])
-
-    base = alt.Chart(combined_hourly).encode(
-        x=alt.X('hour_index:O', title='Hour')
-    )
+# Only the columns the dashboard uses are parsed, with declared dtypes.
+SPEND_SCHEMA = spend_schema(metric_descriptions)
+# Everything that shapes the parsed frames; part of the columnar cache key, so
+# a new metric, format or CSV engine is never served a frame parsed without it.
+SPEND_PARSE_KEY = (SPEND_SCHEMA.key(), SPEND_TIMESTAMP_FORMAT, CSV_ENGINE)
+AMAZON_PARSE_KEY = (AMAZON_SCHEMA.key(), AMAZON_DATE_FORMAT, CSV_ENGINE)
+
+
+def parse_campaign_csv(source):
+    return load_campaign_csv(source, SPEND_SCHEMA, SPEND_TIMESTAMP_FORMAT)
+
+
+def parse_amazon_csv(source):
+    return load_amazon_csv(source, AMAZON_DATE_FORMAT)
+
+
+# Remote sources go through conditional requests (ETag / Last-Modified), so a
+# reload of an unchanged report costs a 304 instead of a download and a parse.
+def read_campaign_frame(source):
+    if isinstance(source, str) and INCREMENTAL_INGEST:
+        return load_incremental_frame(source, parse_campaign_csv)
+    if isinstance(source, str):
+        return load_remote_frame(source, parse_campaign_csv, parse_key=SPEND_PARSE_KEY)
+    return parse_campaign_csv(source)
+
+
+def read_amazon_hourly(source):
+    if isinstance(source, str):
+        return load_remote_frame(source, parse_amazon_csv, parse_key=AMAZON_PARSE_KEY)
+    return parse_amazon_csv(source)
+
+
+def prepare_campaign(df):
+    # Aggregated and indexed once per load; all charts and tables slice the cube.
+    metrics = [m for m in metric_descriptions if m in df.columns]
+    return prepare_campaign_data(df, metrics)
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner="Loading campaign data...")
+def load_campaign_data(key, _uploaded, url):
+    # The load time identifies this copy of the data for the section caches.
+    return prepare_campaign(read_campaign_frame(open_source(_uploaded, url))), time.time()
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner="Loading Amazon sales...")
+def load_amazon_hourly(key, _uploaded, url):
+    return read_amazon_hourly(open_source(_uploaded, url)), time.time()
+
 
-    # Line chart for hourly delta
-    metric_line = base.mark_line(point=True).encode(
-        y=alt.Y(f"{metric}_delta:Q", title=f"Hourly Change in {metric} / SP"),
-        color=alt.Color('date:N', legend=alt.Legend(title="Date")),
-        tooltip=['date', 'hour_index', f"{metric}_delta"]
+# ---- BACKGROUND REFRESH ---- #
+# Remote reports are reloaded by one background thread per server process into
+# a shared, read-only snapshot, so reruns never wait on the network or parsing.
+BACKGROUND_REFRESH = os.environ.get("DASHBOARD_BACKGROUND_REFRESH", "1") == "1"
+REFRESH_INTERVAL_SECONDS = int(os.environ.get("DASHBOARD_REFRESH_SECONDS", str(CACHE_TTL_SECONDS)))
+# With several server processes on one host, point this at a shared directory
+# (e.g. /dev/shm/hourly_campaign_dashboard): one process loads and publishes,
+# all of them memory-map the same snapshot.
+SHARED_DATASET_DIR = os.environ.get("DASHBOARD_SHARED_DATASET_DIR")
+
+
+# Reports the refresher can load; sessions require the ones they did not upload.
+SOURCES = frozenset({"campaign", "amazon"})
+
+
+def load_snapshot(previous, sources):
+    # Only the required sources are loaded; the others keep their frames (or None).
+    campaign = previous.campaign if previous is not None else None
+    amazon_hourly = previous.amazon_hourly if previous is not None else None
+    if "campaign" in sources:
+        df = read_campaign_frame(excel_url)
+        if campaign is None or campaign.df is not df:
+            campaign = prepare_campaign(df)
+    if "amazon" in sources:
+        amazon_hourly = read_amazon_hourly(Sales_url)
+    return snapshot_of(campaign, amazon_hourly, previous)
+
+
+@st.cache_resource
+def get_refresher():
+    load = load_snapshot
+    if SHARED_DATASET_DIR:
+        from shared_dataset import SharedDataset, shared_loader
+        load = shared_loader(SharedDataset(SHARED_DATASET_DIR), load_snapshot)
+    return DatasetRefresher(load, REFRESH_INTERVAL_SECONDS)
+
+
+# ---- INPUT FILE ---- #
+excel_url = "https://research.buywclothes.com/Ads_Automation_Reports/Amazon/spend_master.csv"
+uploaded_file = st.file_uploader("Upload Campaign CSV file", type=["csv"])
+
+# ---- AMAZON HOURLY SALE CSV ---- #
+Sales_url="https://research.buywclothes.com/marketing/amazon_sale_hourly.csv"
+amazon_file = st.sidebar.file_uploader("Upload Amazon Hourly Sales CSV", type=["csv"], key="amazon")
+
+# The refresher only loads the reports that were not uploaded (all of them when
+# the snapshot is shared, since one process loads for every other).
+needed_sources = {name for name, upload in (("campaign", uploaded_file), ("amazon", amazon_file)) if upload is None}
+refresher = None
+if BACKGROUND_REFRESH and needed_sources:
+    refresher = get_refresher()
+    with st.spinner("Loading dashboard data..."):
+        snapshot = refresher.require(SOURCES if SHARED_DATASET_DIR else needed_sources)
+
+if amazon_file is None and refresher is not None:
+    amazon_hourly, amazon_version = snapshot.amazon_hourly, snapshot.loaded_at
+else:
+    amazon_hourly, amazon_version = load_amazon_hourly(
+        source_key(amazon_file, Sales_url), amazon_file, Sales_url
     )
 
-    amazon_bar = base.mark_bar(opacity=0.3).encode(
-        y=alt.Y('SP:Q', stack=None),
-        color=alt.Color('date:N', legend=alt.Legend(title="Date")),
-        tooltip=['date', 'hour_index', 'SP',f"{metric}_delta"]
+if uploaded_file is None and refresher is not None:
+    campaign_data, campaign_version = snapshot.campaign, snapshot.loaded_at
+else:
+    campaign_data, campaign_version = load_campaign_data(
+        source_key(uploaded_file, excel_url), uploaded_file, excel_url
     )
+# Identifies the loaded data in the section and result cache keys.
+data_version = (campaign_version, amazon_version)
+df = campaign_data.df
 
+available_metrics = [m for m in metric_descriptions if m in df.columns]
+campaign_column = campaign_data.campaign_column
 
-    # Combine both on single Y-axis
-    chart = alt.layer(amazon_bar, metric_line)
+# ---- SIDEBAR FILTERS ---- #
+st.sidebar.header("🔎 Filters")
+campaign_options = list(df[campaign_column].cat.categories)
+date_options = sorted(df['date'].unique())
+selected_campaigns = st.sidebar.multiselect("Select Campaigns", campaign_options, default=campaign_options)
+selected_dates = st.sidebar.multiselect("Select Dates", date_options, default=date_options, format_func=format_day)
+# Filled by the metric sections fragment below (widgets written from a fragment
+# into an outside container or the sidebar need Streamlit >= 1.59).
+metric_controls = st.sidebar.container()
+
+if refresher is not None:
+    st.sidebar.caption(f"Report data loaded at {time.strftime('%H:%M:%S', time.localtime(snapshot.loaded_at))}")
+    if refresher.last_error is not None:
+        st.sidebar.warning(f"Background refresh failed, showing the last good data: {refresher.last_error}")
+# Filled by the metric sections fragment with this run's stage timings.
+perf_panel = st.sidebar.container()
+
+
+# ---- SECTION CACHES ---- #
+# Each section is cached on the inputs it depends on, so a rerun only
+# recomputes what changed. ``data_version`` (the load times of the datasets)
+# stands in for the frames themselves, which would be slow to hash.
+RESULT_CACHE_MB = int(os.environ.get("DASHBOARD_RESULT_CACHE_MB", "256"))
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=32, show_spinner=False)
+def filtered_section(_campaign_data, data_version, campaigns, dates):
+    """Cube slice and budget columns for the selected campaigns and dates."""
+    return select_filtered(_campaign_data, campaigns, dates)
+
+
+@st.cache_resource
+def get_result_cache():
+    # Shared by all sessions of this server process.
+    return ResultCache(RESULT_CACHE_MB * 2**20)
 
-    st.altair_chart(chart, use_container_width=True)
 
+def metric_results(cube_filtered, campaign_column, metrics, amazon_hourly):
+    """Combined trend, campaign-level deltas and the delta table for ``metrics``."""
+    combined_hourly = combined_hourly_view(cube_filtered, metrics, amazon_hourly)
+    # Deltas for every metric, shared by the charts and the delta table.
+    campaign_deltas = campaign_delta_view(cube_filtered, campaign_column, metrics)
+    return combined_hourly, campaign_deltas, delta_table(campaign_deltas, campaign_column, metrics)
 
 
-# ---- CAMPAIGN LEVEL ANALYSIS ---- #
-st.subheader("📌 Campaign-Level Metric Changes")
-for metric in selected_metrics:
-    df_grouped = (
-        df_filtered
-        .groupby([campaign_column, 'date', 'hour_index'])[metric]
-        .sum()
-        .reset_index()
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=4, show_spinner=False)
+def amazon_section(amazon_hourly):
+    return amazon_hourly.assign(date=format_days(amazon_hourly['date']))
+
+
+# ---- FILTERED DATA ---- #
+filter_key = (data_version, tuple(selected_campaigns), tuple(selected_dates))
+cube_filtered, df_budget = filtered_section(campaign_data, *filter_key)
+
+
+# ---- METRIC SECTIONS ---- #
+# Changing the metrics or the chart layout reruns only the fragment below; the
+# filters above are not re-evaluated. Results for a whole selection come from
+# the in-process LRU cache, so flipping back to an earlier one is a lookup.
+def render_metric_sections(cube_filtered, filter_key, amazon_hourly):
+    with metric_controls:
+        chosen = st.multiselect("Select Metrics", available_metrics, default=["Spend"], key="metrics")
+        single_chart = st.toggle("One chart per section (metric dropdown)", value=True, key="single_chart")
+    # Canonical order, so the same set of metrics always maps to one entry.
+    selected_metrics = [m for m in available_metrics if m in chosen]
+
+    result_cache = get_result_cache()
+    hits_before = result_cache.hits
+    combined_hourly, campaign_deltas, delta_summary = result_cache.get_or_compute(
+        selection_key(*filter_key, selected_metrics),
+        lambda: metric_results(cube_filtered, campaign_column, selected_metrics, amazon_hourly),
     )
+    with metric_controls:
+        st.caption(
+            f"Result cache: {result_cache.hits} hits, {result_cache.misses} misses, "
+            f"{len(result_cache)} entries ({result_cache.bytes / 2**20:.1f} MB)"
+        )
 
-    df_grouped = df_grouped.sort_values(by=[campaign_column, 'date', 'hour_index'])
-    df_grouped['Delta'] = df_grouped.groupby([campaign_column, 'date'])[metric].diff()
-    df_grouped['Delta'] = df_grouped['Delta'].fillna(df_grouped[metric])
-
-    df_grouped['date'] = df_grouped['date'].astype(str)
-    df_grouped['camp_date'] = df_grouped[campaign_column] + " | " + df_grouped['date']
-
-    chart = (
-        alt.Chart(df_grouped)
-        .mark_line(point=True)
-        .encode(
-            x='hour_index:O',
-            y=alt.Y('Delta:Q', title=f"Hourly Change in {metric}"),
-            color=alt.Color('camp_date:N', legend=alt.Legend(title="Campaign | Date")),
-            tooltip=[campaign_column, 'date', 'hour_index', 'Delta']
+    # ---- COMBINED HOURLY TREND ---- #
+    st.subheader("🧮 Combined Hourly Trend (All Campaigns)")
+    with perf.stage("chart build, combined", rows_in=combined_hourly):
+        if single_chart and selected_metrics:
+            st.altair_chart(combined_trend_metrics_chart(combined_hourly, selected_metrics), use_container_width=True)
+        else:
+            for metric in selected_metrics:
+                st.altair_chart(combined_trend_chart(combined_hourly, metric), use_container_width=True)
+
+    # ---- CAMPAIGN LEVEL ANALYSIS ---- #
+    st.subheader("📌 Campaign-Level Metric Changes")
+    with perf.stage("chart build, campaign", rows_in=campaign_deltas):
+        if single_chart and selected_metrics:
+            # Top campaigns per metric plus an "Other" series, within the row budget.
+            df_grouped = campaign_metrics_chart_data(campaign_deltas, campaign_column, selected_metrics)
+            st.altair_chart(campaign_change_metrics_chart(df_grouped, campaign_column, selected_metrics), use_container_width=True)
+            if (df_grouped[campaign_column] == OTHER).any():
+                st.caption(f"Smaller campaigns are combined into \"{OTHER}\" to keep the chart readable.")
+            if df_grouped.attrs['fewer_campaigns']:
+                st.caption(
+                    f"With this many metrics and dates, {', '.join(df_grouped.attrs['fewer_campaigns'])} "
+                    "show fewer campaigns than in a chart of their own; turn off the one-chart toggle to see more."
+                )
+        else:
+            for metric in selected_metrics:
+                # Top campaigns by this metric plus an "Other" series, within the row budget.
+                df_grouped = campaign_chart_data(campaign_deltas, campaign_column, metric)
+                chart = campaign_change_chart(df_grouped, campaign_column, metric)
+                st.altair_chart(chart, use_container_width=True)
+                if (df_grouped[campaign_column] == OTHER).any():
+                    st.caption(f"Smaller campaigns are combined into \"{OTHER}\" to keep the chart readable.")
+
+    # ---- AMAZON SALES CHART (Standalone) ---- #
+    if amazon_hourly is not None:
+        st.subheader("🛒 Amazon Total Hourly Sales")
+        with perf.stage("chart build, Amazon", rows_in=amazon_hourly):
+            st.altair_chart(amazon_sales_chart(amazon_section(amazon_hourly)), use_container_width=True)
+
+    # ---- SUMMARY TABLES ---- #
+    st.subheader("📋 Summary Tables")
+    col1, col2 = st.columns(2)
+
+    with perf.stage("table render", rows_in=len(combined_hourly) + len(delta_summary)):
+        with col1:
+            st.markdown("**Combined Hourly Metrics (All Campaigns)**")
+            st.dataframe(combined_hourly)
+
+        with col2:
+            st.markdown("**Hourly Delta by Campaign**")
+            st.dataframe(delta_summary)
+
+    # ---- METRIC GUIDE ---- #
+    with st.sidebar:
+        st.markdown("---")
+        st.subheader("ℹ️ Metric Descriptions")
+        for m in selected_metrics:
+            st.markdown(f"**{m}**: {metric_descriptions.get(m, 'No description')} ")
+
+    lookups = result_cache.hits + result_cache.misses
+    return {
+        "metrics": len(selected_metrics),
+        "result_cache_hit": result_cache.hits > hits_before,
+        "result_cache": {
+            "hits": result_cache.hits,
+            "misses": result_cache.misses,
+            "hit_rate": result_cache.hits / lookups if lookups else None,
+            "entries": len(result_cache),
+            "bytes": result_cache.bytes,
+        },
+    }
+
+
+# ---- PERFORMANCE PANEL ---- #
+def render_perf_panel(recorders):
+    recorders = [r for r in recorders if r is not None]
+    with st.expander("⏱️ Performance"):
+        for recorder in recorders:
+            summary = f"{recorder.stage_seconds * 1e3:.0f} ms in {len(recorder.stages)} stages"
+            if recorder.wall_seconds is not None:
+                summary = f"{recorder.wall_seconds * 1e3:.0f} ms ({summary})"
+            st.caption(f"{recorder.label}: {summary}")
+        stages = pd.DataFrame([
+            {
+                "run": recorder.label,
+                "stage": s.name,
+                "ms": round(s.seconds * 1e3, 1),
+                "rows in": s.rows_in,
+                "rows out": s.rows_out,
+                "memory Δ MB": None if s.memory_delta is None else round(s.memory_delta / 2**20, 1),
+            }
+            for recorder in recorders for s in recorder.stages
+        ], columns=["run", "stage", "ms", "rows in", "rows out", "memory Δ MB"])
+        st.dataframe(stages.astype({"rows in": "Int64", "rows out": "Int64"}), hide_index=True)
+        st.download_button(
+            "Download timings (JSON)", perf.to_json(recorders),
+            file_name="dashboard_timings.json", mime="application/json", on_click="ignore",
         )
-        .properties(title=f"Hourly Change in {metric} by Campaign & Date", height=300)
-    )
-    st.altair_chart(chart, use_container_width=True)
-
-# ---- AMAZON SALES CHART (Standalone) ---- #
-if amazon_hourly is not None:
-    st.subheader("🛒 Amazon Total Hourly Sales")
-    chart = alt.Chart(amazon_hourly).mark_bar().encode(
-        x='hour_index:O',
-        y='SP:Q',
-        color='date:N',
-        tooltip=['date', 'hour_index', 'SP']
-    ).properties(title="Total Hourly SP from Amazon Data", height=300)
-    st.altair_chart(chart, use_container_width=True)
-
-# ---- SUMMARY TABLES ---- #
-st.subheader("📋 Summary Tables")
-col1, col2 = st.columns(2)
-
-with col1:
-    st.markdown("**Combined Hourly Metrics (All Campaigns)**")
-    st.dataframe(combined_hourly)
-
-with col2:
-    st.markdown("**Hourly Delta by Campaign**")
-    delta_table = df_filtered.groupby([campaign_column, 'date', 'hour_index'])[selected_metrics].sum().reset_index()
-    delta_table = delta_table.sort_values(by=[campaign_column, 'date', 'hour_index'])
-
-    for metric in selected_metrics:
-        delta_table[f"{metric} Δ"] = delta_table.groupby([campaign_column, 'date'])[metric].diff()
-        delta_table[f"{metric} Δ"] = delta_table[f"{metric} Δ"].fillna(delta_table[metric])
-
-    delta_columns = [campaign_column, 'date', 'hour_index'] + [f"{m} Δ" for m in selected_metrics]
-    st.dataframe(delta_table[delta_columns])
-
-# ---- METRIC GUIDE ---- #
+
+
+@st.cache_resource
+def get_perf_log():
+    # Opt-in through DASHBOARD_PERF_LOG; one rotating file per server process.
+    return PerfLog(PERF_LOG_PATH) if PERF_LOG_PATH else None
+
+
+@st.fragment
+def metric_sections(cube_filtered, filter_key, amazon_hourly, run_timings):
+    with perf.recording("metric sections") as section_timings:
+        details = render_metric_sections(cube_filtered, filter_key, amazon_hourly)
+
+    # A full run passes fresh run_timings; a fragment rerun replays the old ones.
+    full_run = st.session_state.get("perf_logged_run") is not run_timings
+    st.session_state["perf_logged_run"] = run_timings
+    if full_run:
+        # The wall time from the top of the script, cache lookups and widgets included.
+        run_timings.finish()
+    perf_log = get_perf_log()
+    if perf_log is not None:
+        perf_log.write(rerun_record(
+            "full" if full_run else "fragment",
+            run_timings.wall_seconds if full_run else section_timings.wall_seconds,
+            [run_timings, section_timings] if full_run else [section_timings],
+            campaigns=len(filter_key[1]),
+            dates=len(filter_key[2]),
+            data_rows=len(df),
+            selected_rows=len(cube_filtered),
+            **details,
+        ))
+
+    if PERF_PANEL:
+        # On a fragment rerun, run_timings is still the last full run's.
+        background = refresher.last_timings if refresher is not None else None
+        with perf_panel:
+            render_perf_panel([run_timings, section_timings, background])
+
+
+metric_sections(cube_filtered, filter_key, amazon_hourly, run_timings)
+
+# ---- PROFILE RESULT ---- #
+if profiler is not None:
+    st.session_state["last_profile"] = profiling.finish(st.session_state.pop("running_profiler"))
+
 st.sidebar.markdown("---")
-st.sidebar.subheader("ℹ️ Metric Descriptions")
-for m in selected_metrics:
-    st.sidebar.markdown(f"**{m}**: {metric_descriptions.get(m, 'No description')} ")
+st.sidebar.button(
+    "🔬 Profile next rerun",
+    on_click=lambda: st.session_state.update(profile_next_run=True),
+    help="Reruns the dashboard under cProfile and shows where the time went.",
+)
+if profile_requested and profiler is None:
+    st.sidebar.warning("Another rerun is being profiled; try again in a moment.")
+last_profile = st.session_state.get("last_profile")
+if last_profile is not None:
+    captured = time.strftime('%H:%M:%S', time.localtime(last_profile.captured_at))
+    with st.sidebar.expander(f"Profile of the {captured} rerun ({last_profile.seconds:.2f} s)"):
+        st.dataframe(pd.DataFrame(last_profile.top), hide_index=True)
+        st.download_button(
+            "Download .prof", last_profile.prof,
+            file_name=f"dashboard_{captured.replace(':', '')}.prof",
+            mime="application/octet-stream", on_click="ignore",
+        )
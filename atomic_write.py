@@ -0,0 +1,22 @@
+"""Atomic replacement of files in a directory shared between processes."""
+import os
+import tempfile
+
+
+def write_atomic(path, write):
+    """Replace ``path`` with what ``write(f)`` writes to a binary file.
+
+    The data goes to a temp file of its own in the same directory, then
+    replaces ``path`` in one step: readers see the old file or the new one,
+    and processes writing the same path at once never share a temp file. The
+    temp file is removed if ``write`` raises.
+    """
+    directory, name = os.path.split(path)
+    fd, tmp = tempfile.mkstemp(dir=directory or ".", prefix=name + ".", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
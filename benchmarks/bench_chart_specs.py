@@ -0,0 +1,127 @@
+"""Size of the chart payloads the dashboard sends, before and after charts.py.
+
+    python benchmarks/bench_chart_specs.py [--campaigns 10 50] [--days 1 7] [--metrics 3]
+
+Builds a synthetic hourly cube and, per section, the charts as the dashboard
+used to build them (whole frames, inline ``camp_date`` labels, data on every
+layer), as ``charts.py`` builds them one chart per metric, and as a single
+long-format chart with a metric dropdown. Reports the chart count and two
+sizes in KB: the Vega-Lite JSON with the data inlined (Altair's default
+transport) and what Streamlit ships (spec JSON plus its Arrow datasets).
+"""
+import argparse
+import json
+import os
+import sys
+
+import altair as alt
+import numpy as np
+import pandas as pd
+from streamlit.elements.vega_charts import _convert_altair_to_vega_lite_spec
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from campaign_core import add_hourly_deltas, combined_hourly_trend, format_days  # noqa: E402
+from charts import (  # noqa: E402
+    campaign_change_chart,
+    campaign_change_metrics_chart,
+    campaign_chart_data,
+    campaign_metrics_chart_data,
+    combined_trend_chart,
+    combined_trend_metrics_chart,
+)
+from synthetic import METRICS  # noqa: E402
+
+
+def make_cube(campaigns, days, seed=0):
+    rng = np.random.default_rng(seed)
+    names = pd.Categorical([f"campaign_{i:04d}" for i in range(campaigns)])
+    cube = pd.DataFrame({
+        "Campaign Name": names.repeat(days * 24),
+        "date": np.tile(np.repeat(np.arange(20089, 20089 + days, dtype="int32"), 24), campaigns),
+        "hour_index": np.tile(np.arange(24, dtype="int8"), campaigns * days),
+    })
+    for metric in METRICS:
+        cube[metric] = rng.random(len(cube)) * 100
+    return cube
+
+
+def old_combined_chart(combined_hourly, metric):
+    base = alt.Chart(combined_hourly).encode(x=alt.X('hour_index:O', title='Hour'))
+    metric_line = base.mark_line(point=True).encode(
+        y=alt.Y(f"{metric}_delta:Q"), color='date:N', tooltip=['date', 'hour_index', f"{metric}_delta"])
+    amazon_bar = base.mark_bar(opacity=0.3).encode(
+        y=alt.Y('SP:Q', stack=None), color='date:N', tooltip=['date', 'hour_index', 'SP', f"{metric}_delta"])
+    return alt.layer(amazon_bar, metric_line)
+
+
+def old_campaign_chart(campaign_deltas, metric):
+    df_grouped = campaign_deltas[["Campaign Name", 'date', 'hour_index', metric, f"{metric} Δ"]]
+    df_grouped = df_grouped.rename(columns={f"{metric} Δ": 'Delta'})
+    df_grouped['camp_date'] = df_grouped["Campaign Name"].astype(str) + " | " + df_grouped['date']
+    return alt.Chart(df_grouped).mark_line(point=True).encode(
+        x='hour_index:O', y='Delta:Q', color='camp_date:N',
+        tooltip=["Campaign Name", 'date', 'hour_index', 'Delta'])
+
+
+def inline_kb(chart):
+    with alt.data_transformers.disable_max_rows():
+        return len(chart.to_json()) / 1e3
+
+
+def streamlit_kb(chart):
+    spec = _convert_altair_to_vega_lite_spec(chart)
+    datasets = spec.pop("datasets", {})
+    return (len(json.dumps(spec)) + sum(len(data) for data in datasets.values())) / 1e3
+
+
+def section_charts(cube, metrics):
+    combined = combined_hourly_trend(cube, metrics)
+    combined['SP'] = np.random.default_rng(1).random(len(combined)) * 1000
+    combined['date'] = format_days(combined['date'])
+    combined = add_hourly_deltas(combined, ['date'], metrics, name="{}_delta")
+
+    deltas = add_hourly_deltas(cube, ["Campaign Name", 'date'], metrics)
+    deltas['date'] = format_days(deltas['date'])
+
+    campaign_data = campaign_metrics_chart_data(deltas, "Campaign Name", metrics)
+    return {
+        "combined": {
+            "before": [old_combined_chart(combined, m) for m in metrics],
+            "per metric": [combined_trend_chart(combined, m) for m in metrics],
+            "single": [combined_trend_metrics_chart(combined, metrics)],
+        },
+        "campaign": {
+            "before": [old_campaign_chart(deltas, m) for m in metrics],
+            "per metric": [
+                campaign_change_chart(campaign_chart_data(deltas, "Campaign Name", m), "Campaign Name", m)
+                for m in metrics
+            ],
+            "single": [campaign_change_metrics_chart(campaign_data, "Campaign Name", metrics)],
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--campaigns", type=int, nargs="+", default=[10, 50])
+    parser.add_argument("--days", type=int, nargs="+", default=[1, 7])
+    parser.add_argument("--metrics", type=int, default=3)
+    args = parser.parse_args()
+
+    metrics = METRICS[:args.metrics]
+    print(f"{'campaigns':>9} {'days':>4} {'section':>8} {'variant':>10} {'charts':>6} "
+          f"{'inline KB':>10} {'streamlit KB':>12}")
+    for campaigns in args.campaigns:
+        for days in args.days:
+            cube = make_cube(campaigns, days)
+            for section, variants in section_charts(cube, metrics).items():
+                for variant, charts in variants.items():
+                    inline = sum(inline_kb(c) for c in charts)
+                    shipped = sum(streamlit_kb(c) for c in charts)
+                    print(f"{campaigns:>9} {days:>4} {section:>8} {variant:>10} {len(charts):>6} "
+                          f"{inline:>10.1f} {shipped:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
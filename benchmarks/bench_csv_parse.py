@@ -0,0 +1,51 @@
+"""Parse time of spend_master-shaped CSVs with the pyarrow and C engines.
+
+    python benchmarks/bench_csv_parse.py [--campaigns 500] [--days 1 8 84] [--repeat 3]
+
+Writes synthetic files (see ``synthetic.py``) to a temporary directory and
+reports the best of ``--repeat`` runs of ``read_report_csv`` per engine and
+file size.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from csv_schema import read_report_csv, spend_schema  # noqa: E402
+from synthetic import METRICS, write_spend_csv  # noqa: E402
+
+
+def best_time(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--campaigns", type=int, default=500)
+    parser.add_argument("--days", type=int, nargs="+", default=[1, 8, 84])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    schema = spend_schema(METRICS)
+    print(f"{'rows':>10} {'MB':>8} {'c (s)':>8} {'pyarrow (s)':>12} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for days in args.days:
+            rows = args.campaigns * days * 24
+            path = os.path.join(tmp, f"spend_{days}d.csv")
+            write_spend_csv(path, args.campaigns, days)
+            size_mb = os.path.getsize(path) / 1e6
+            c_time = best_time(lambda: read_report_csv(path, schema, engine="c"), args.repeat)
+            arrow_time = best_time(lambda: read_report_csv(path, schema, engine="pyarrow"), args.repeat)
+            print(f"{rows:>10} {size_mb:>8.1f} {c_time:>8.3f} {arrow_time:>12.3f} {c_time / arrow_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Per-stage latency and peak memory of the dashboard pipeline, headless.
+
+    python benchmarks/bench_pipeline.py [--campaigns 100 500] [--days 7 30] [--ad-groups 1] [--metrics 3] [--repeat 3]
+
+Generates spend_master- and amazon_sale_hourly-shaped CSVs (see
+``synthetic.py``) per scale and runs the stages behind one dashboard render
+with every campaign and date selected: load, filter, budget, combined
+aggregation, deltas and chart-spec generation. Reports the best of
+``--repeat`` runs per stage and the peak Python-heap allocation of one extra
+run traced with tracemalloc (Arrow buffers allocated by the CSV reader are
+outside the Python heap and not counted).
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from streamlit.elements.vega_charts import _convert_altair_to_vega_lite_spec
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from campaign_core import (  # noqa: E402
+    add_hourly_deltas,
+    budget_columns,
+    campaign_delta_view,
+    combined_hourly_trend,
+    filtered_columns,
+    format_days,
+    load_amazon_csv,
+    load_campaign_csv,
+    merge_amazon_sales,
+    prepare_campaign_data,
+)
+from charts import (  # noqa: E402
+    amazon_sales_chart,
+    campaign_change_metrics_chart,
+    campaign_metrics_chart_data,
+    combined_trend_metrics_chart,
+)
+from csv_schema import spend_schema  # noqa: E402
+from synthetic import METRICS, write_amazon_csv, write_spend_csv  # noqa: E402
+from timestamps import AMAZON_DATE_FORMAT, SPEND_TIMESTAMP_FORMAT  # noqa: E402
+
+
+def load_campaign(path):
+    df = load_campaign_csv(path, spend_schema(METRICS), SPEND_TIMESTAMP_FORMAT)
+    return prepare_campaign_data(df, [m for m in METRICS if m in df.columns])
+
+
+def stages(spend_path, amazon_path, metrics):
+    """(name, fn) pairs; each fn takes the outputs so far and returns its own."""
+
+    def filter_stage(state):
+        data = state['load_campaign']
+        campaigns = list(data.df[data.campaign_column].cat.categories)
+        dates = sorted(data.df['date'].unique())
+        return data.row_index.select(
+            data.df, campaigns, dates, columns=filtered_columns(data.df, data.campaign_column, [])
+        ), data.cube_index.select(data.cube, campaigns, dates)
+
+    def combined_stage(state):
+        combined = merge_amazon_sales(combined_hourly_trend(state['filter'][1], metrics), state['load_amazon'])
+        combined['date'] = format_days(combined['date'])
+        return combined
+
+    def delta_stage(state):
+        campaign_column = state['load_campaign'].campaign_column
+        combined = add_hourly_deltas(state['combined'], ['date'], metrics, name="{}_delta")
+        return combined, campaign_delta_view(state['filter'][1], campaign_column, metrics)
+
+    def chart_stage(state):
+        campaign_column = state['load_campaign'].campaign_column
+        combined, campaign_deltas = state['deltas']
+        amazon_hourly = state['load_amazon']
+        chart_data = campaign_metrics_chart_data(campaign_deltas, campaign_column, metrics)
+        charts = [
+            combined_trend_metrics_chart(combined, metrics),
+            campaign_change_metrics_chart(chart_data, campaign_column, metrics),
+            amazon_sales_chart(amazon_hourly.assign(date=format_days(amazon_hourly['date']))),
+        ]
+        return [_convert_altair_to_vega_lite_spec(chart) for chart in charts]
+
+    return [
+        ('load_campaign', lambda state: load_campaign(spend_path)),
+        ('load_amazon', lambda state: load_amazon_csv(amazon_path, AMAZON_DATE_FORMAT)),
+        ('filter', filter_stage),
+        ('budget', lambda state: budget_columns(state['filter'][0], state['load_campaign'].campaign_column)),
+        ('combined', combined_stage),
+        ('deltas', delta_stage),
+        ('chart_specs', chart_stage),
+    ]
+
+
+def measure(fn, state, repeat):
+    """Best wall time over ``repeat`` runs, then the traced peak of one more run."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(state)
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        fn(state)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, min(times), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--campaigns", type=int, nargs="+", default=[100, 500])
+    parser.add_argument("--days", type=int, nargs="+", default=[7, 30])
+    parser.add_argument("--ad-groups", type=int, default=1, help="spend rows per campaign and hour")
+    parser.add_argument("--metrics", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    metrics = METRICS[:args.metrics]
+    print(f"{'campaigns':>9} {'days':>4} {'rows':>9} {'stage':>13} {'ms':>9} {'peak MB':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for campaigns in args.campaigns:
+            for days in args.days:
+                spend_path = os.path.join(tmp, f"spend_{campaigns}x{days}.csv")
+                amazon_path = os.path.join(tmp, f"amazon_{days}.csv")
+                write_spend_csv(spend_path, campaigns, days, ad_groups=args.ad_groups)
+                write_amazon_csv(amazon_path, days)
+                rows = campaigns * days * 24 * args.ad_groups
+
+                state = {}
+                for name, fn in stages(spend_path, amazon_path, metrics):
+                    state[name], seconds, peak = measure(fn, state, args.repeat)
+                    print(f"{campaigns:>9} {days:>4} {rows:>9} {name:>13} {seconds * 1e3:>9.1f} {peak / 2**20:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
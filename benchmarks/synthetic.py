@@ -0,0 +1,54 @@
+"""Synthetic report CSVs shaped like the dashboard's two sources.
+
+``spend_master.csv`` has one row per campaign, ad group and hour, with the
+metric and budget columns.
+``amazon_sale_hourly.csv`` has one row per hour with the Amazon SP and a
+column the dashboard does not read. Scale is campaigns x days x hours.
+"""
+import numpy as np
+import pandas as pd
+
+METRICS = ["Spend", "Impressions", "Clicks", "CTR", "Orders", "Sales", "ROAS", "CPC", "NTB orders", "vCTR"]
+START = "2025-01-01"
+
+
+def spend_frame(campaigns=500, days=7, hours=24, seed=0, ad_groups=1):
+    """Hourly campaign rows: every campaign's ad groups once per hour of every day."""
+    rng = np.random.default_rng(seed)
+    stamps = _hourly_stamps(days, hours)
+    per_hour = campaigns * ad_groups
+    rows = len(stamps) * per_hour
+    frame = pd.DataFrame({
+        "timestamp": np.repeat(stamps.strftime("%Y-%m-%d %H:%M:%S"), per_hour),
+        "Campaign Name": np.tile(np.repeat([f"campaign_{i:04d}" for i in range(campaigns)], ad_groups), len(stamps)),
+        "Ad Group": np.tile([f"ad_group_{i:02d}" for i in range(ad_groups)], campaigns * len(stamps)),
+    })
+    for metric in METRICS:
+        frame[metric] = rng.random(rows) * 100
+    frame["Budget"] = 1000.0
+    return frame
+
+
+def amazon_frame(days=7, hours=24, seed=0):
+    """Hourly Amazon sales rows with ISO dates."""
+    rng = np.random.default_rng(seed)
+    stamps = _hourly_stamps(days, hours)
+    return pd.DataFrame({
+        "Date": stamps.strftime("%Y-%m-%d"),
+        "Hour": stamps.hour,
+        "SP": rng.random(len(stamps)) * 1000,
+        "Orders": rng.integers(0, 50, len(stamps)),
+    })
+
+
+def write_spend_csv(path, campaigns=500, days=7, hours=24, seed=0, ad_groups=1):
+    spend_frame(campaigns, days, hours, seed, ad_groups).to_csv(path, index=False)
+
+
+def write_amazon_csv(path, days=7, hours=24, seed=0):
+    amazon_frame(days, hours, seed).to_csv(path, index=False)
+
+
+def _hourly_stamps(days, hours):
+    day_starts = pd.date_range(START, periods=days, freq="D")
+    return (day_starts.repeat(hours) + pd.to_timedelta(np.tile(np.arange(hours), days), unit="h"))
@@ -0,0 +1,359 @@
+"""Loading and aggregations behind the hourly campaign dashboard.
+
+Everything here is plain pandas/NumPy with no Streamlit dependency, so each
+stage can be timed, cached or tested on its own; the dashboard script only
+wires the functions to widgets and caches.
+
+The campaign feed is summed once per data load into an hourly cube
+(campaign x date x hour, one column per metric). Every chart and table is then
+derived by slicing that cube instead of re-grouping the raw rows.
+
+Keys are kept compact: the campaign column is Categorical, ``date`` is an
+int32 day ordinal (days since 1970-01-01) and ``hour_index`` is int8, so
+filtering and grouping run on integer arrays. Dates are only turned back into
+``YYYY-MM-DD`` labels for display. Sidebar selections are resolved through a
+per-campaign / per-day row index rather than a full-length boolean mask.
+"""
+import datetime
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+import perf
+from csv_schema import AMAZON_SCHEMA, read_report_csv
+from timestamps import parse_timestamps
+
+HOUR_KEYS = ['date', 'hour_index']
+EPOCH = datetime.date(1970, 1, 1)
+
+
+def find_campaign_column(df):
+    """The first column whose name mentions 'campaign'."""
+    return [col for col in df.columns if 'campaign' in col.lower()][0]
+
+
+def to_day_ordinal(timestamps):
+    """Calendar day of each timestamp as int32 days since 1970-01-01."""
+    if timestamps.dt.tz is not None:
+        timestamps = timestamps.dt.tz_localize(None)
+    days = timestamps.to_numpy().astype('datetime64[D]').astype('int64')
+    return pd.Series(days.astype('int32'), index=timestamps.index)
+
+
+def format_day(day):
+    """``YYYY-MM-DD`` label of a day ordinal."""
+    return (EPOCH + datetime.timedelta(days=int(day))).isoformat()
+
+
+def format_days(days):
+    """``YYYY-MM-DD`` labels for a Series of day ordinals."""
+    labels = {day: format_day(day) for day in days.unique()}
+    return days.map(labels)
+
+
+def add_time_features(df, campaign_column):
+    """Derive ``date`` and ``hour_index`` from ``timestamp`` and compact the keys.
+
+    Rows without a parseable timestamp have no hour to group into and are
+    dropped, as the groupbys on ``date`` used to drop them.
+    """
+    if df['timestamp'].isna().any():
+        df = df[df['timestamp'].notna()].reset_index(drop=True)
+    df['date'] = to_day_ordinal(df['timestamp'])
+    df['hour_index'] = df['timestamp'].dt.hour.astype('int8')
+    campaign = df[campaign_column].astype('category')
+    if not campaign.cat.categories.is_monotonic_increasing:
+        # Keep codes in name order so sorted groupbys and sidebar options match.
+        campaign = campaign.cat.reorder_categories(campaign.cat.categories.sort_values())
+    df[campaign_column] = campaign
+    return df
+
+
+def rollup_hourly(df, campaign_column):
+    """Roll raw feed rows (e.g. one per ad group) up to campaign x date x hour.
+
+    Numeric columns are summed, except ``Budget`` (a daily setting repeated
+    on every row), which takes its maximum. ``timestamp`` keeps the latest
+    value so an append-only reader can still tell where the feed ends, and any
+    other column its first value. Rows come out sorted by the keys.
+    """
+    keys = [campaign_column] + HOUR_KEYS
+    aggregations = {}
+    for column in df.columns.difference(keys, sort=False):
+        if column in ('Budget', 'timestamp'):
+            aggregations[column] = 'max'
+        elif pd.api.types.is_numeric_dtype(df[column]):
+            aggregations[column] = 'sum'
+        else:
+            aggregations[column] = 'first'
+    return df.groupby(keys, observed=True).agg(aggregations).reset_index()
+
+
+def load_campaign_csv(source, schema, timestamp_format=None):
+    """Parse a spend_master-shaped CSV into its hourly rollup.
+
+    Everything downstream works at campaign x date x hour grain, so the raw
+    rows are rolled up here, once per load, and the rollup is what the
+    columnar cache persists.
+    """
+    with perf.stage("parse") as timing:
+        df = timing.output(read_report_csv(source, schema))
+    with perf.stage("time features", rows_in=df) as timing:
+        df['timestamp'] = parse_timestamps(df['timestamp'], timestamp_format)
+        df = timing.output(add_time_features(df, find_campaign_column(df)))
+    with perf.stage("hourly rollup", rows_in=df) as timing:
+        return timing.output(rollup_hourly(df, find_campaign_column(df)))
+
+
+def amazon_hourly_sales(amazon_df):
+    """SP summed per day ordinal and hour, as ``date``, ``hour_index`` and ``SP``."""
+    with perf.stage("Amazon grouping", rows_in=amazon_df) as timing:
+        amazon_hourly = amazon_df.groupby(['Date', 'Hour'])['SP'].sum().reset_index()
+        amazon_hourly = amazon_hourly.rename(columns={'Hour': 'hour_index', 'Date': 'date'})
+        amazon_hourly['hour_index'] = amazon_hourly['hour_index'].astype('int8')
+        return timing.output(amazon_hourly)
+
+
+def load_amazon_csv(source, date_format=None):
+    """Parse an amazon_sale_hourly-shaped CSV into hourly SP per day ordinal."""
+    with perf.stage("parse (Amazon)") as timing:
+        # Hour and SP arrive as float32, non-numeric values already coerced to NaN
+        amazon_df = read_report_csv(source, AMAZON_SCHEMA)
+        amazon_df['Date'] = parse_timestamps(amazon_df['Date'], date_format, dayfirst=True)
+        # Blank or unparseable dates would otherwise become day 0 (1970-01-01).
+        amazon_df = amazon_df.dropna(subset=['Date'])
+        amazon_df['Date'] = to_day_ordinal(amazon_df['Date'])
+        timing.output(amazon_df)
+    return amazon_hourly_sales(amazon_df)
+
+
+def _postings(codes, size):
+    # Row ids grouped by code: rows of code c are order[bounds[c]:bounds[c + 1]],
+    # in ascending row order. Negative codes (missing values) are left out.
+    order = np.argsort(codes, kind='stable').astype(np.int64)
+    bounds = np.searchsorted(codes[order], np.arange(size + 1))
+    return order, bounds
+
+
+class SelectionIndex:
+    """Sorted row ids per campaign and per day of a frame.
+
+    ``rows`` gathers the postings of whichever side of the selection covers
+    fewer rows and filters them with a lookup table on the other side, so its
+    cost follows the number of selected rows rather than the frame length.
+    """
+
+    def __init__(self, frame, campaign_column):
+        campaign = frame[campaign_column]
+        self.campaigns = campaign.cat.categories
+        self.days, day_codes = np.unique(frame['date'].to_numpy(), return_inverse=True)
+        self._campaign_codes = campaign.cat.codes.to_numpy()
+        self._day_codes = day_codes.astype(np.int32)
+        self._by_campaign = _postings(self._campaign_codes, len(self.campaigns))
+        self._by_day = _postings(self._day_codes, len(self.days))
+
+    def to_arrays(self):
+        """The index as plain NumPy arrays (the campaign categories excluded)."""
+        return {
+            'days': self.days,
+            'campaign_codes': self._campaign_codes,
+            'day_codes': self._day_codes,
+            'campaign_order': self._by_campaign[0],
+            'campaign_bounds': self._by_campaign[1],
+            'day_order': self._by_day[0],
+            'day_bounds': self._by_day[1],
+        }
+
+    @classmethod
+    def from_arrays(cls, campaigns, arrays):
+        """Rebuild an index from ``to_arrays`` output, e.g. memory-mapped arrays."""
+        index = cls.__new__(cls)
+        index.campaigns = campaigns
+        index.days = arrays['days']
+        index._campaign_codes = arrays['campaign_codes']
+        index._day_codes = arrays['day_codes']
+        index._by_campaign = (arrays['campaign_order'], arrays['campaign_bounds'])
+        index._by_day = (arrays['day_order'], arrays['day_bounds'])
+        return index
+
+    def _day_codes_of(self, dates):
+        dates = np.asarray(list(dates), dtype=self.days.dtype)
+        pos = np.searchsorted(self.days, dates)
+        found = pos < len(self.days)
+        found[found] = self.days[pos[found]] == dates[found]
+        return pos[found]
+
+    @staticmethod
+    def _gather(postings, codes):
+        order, bounds = postings
+        if len(codes) == 0:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([order[bounds[c]:bounds[c + 1]] for c in codes])
+
+    @staticmethod
+    def _lookup(codes, size):
+        # One spare False slot at the end, so code -1 (missing) never matches.
+        selected = np.zeros(size + 1, dtype=bool)
+        selected[codes] = True
+        return selected
+
+    def rows(self, campaigns, dates):
+        """Ascending row positions in the selected campaigns and days."""
+        # Unique codes, so a value listed twice does not gather its rows twice.
+        campaign_codes = np.unique(self.campaigns.get_indexer(list(campaigns)))
+        campaign_codes = campaign_codes[campaign_codes >= 0]
+        day_codes = np.unique(self._day_codes_of(dates))
+
+        campaign_bounds, day_bounds = self._by_campaign[1], self._by_day[1]
+        campaign_rows = (campaign_bounds[campaign_codes + 1] - campaign_bounds[campaign_codes]).sum()
+        day_rows = (day_bounds[day_codes + 1] - day_bounds[day_codes]).sum()
+        if campaign_rows <= day_rows:
+            rows = self._gather(self._by_campaign, campaign_codes)
+            keep = self._lookup(day_codes, len(self.days))[self._day_codes[rows]]
+        else:
+            rows = self._gather(self._by_day, day_codes)
+            keep = self._lookup(campaign_codes, len(self.campaigns))[self._campaign_codes[rows]]
+        return np.sort(rows[keep])
+
+    def select(self, frame, campaigns, dates, columns=None):
+        """Rows of ``frame`` (the frame this index was built on) in the selection.
+
+        With ``columns``, only those columns are gathered.
+        """
+        rows = self.rows(campaigns, dates)
+        if columns is None:
+            return frame.take(rows).reset_index(drop=True)
+        return frame.iloc[rows, frame.columns.get_indexer(columns)].reset_index(drop=True)
+
+
+def build_hourly_cube(df, campaign_column, metrics):
+    """Sum all ``metrics`` per campaign, date and hour in a single groupby.
+
+    The result is sorted by campaign, date and hour.
+    """
+    grouped = df.groupby([campaign_column] + HOUR_KEYS, observed=True)
+    return grouped[list(metrics)].sum().reset_index()
+
+
+def filtered_columns(df, campaign_column, metrics):
+    """Columns the filtered view needs: keys, selected metrics and budget inputs."""
+    columns = [campaign_column] + HOUR_KEYS + list(metrics)
+    return columns + [c for c in ('Spend', 'Budget') if c in df.columns and c not in columns]
+
+
+def budget_columns(filtered, campaign_column):
+    """Running spend and remaining budget per campaign and day, as a separate frame."""
+    cumulative_spend = filtered.groupby([campaign_column, 'date'], observed=True)['Spend'].cumsum()
+    return pd.DataFrame({
+        'cumulative_spend': cumulative_spend,
+        'budget_left': filtered['Budget'] - cumulative_spend,
+    })
+
+
+@dataclass
+class CampaignData:
+    """A loaded campaign feed with everything derived from it once per load."""
+    df: pd.DataFrame
+    campaign_column: str
+    cube: pd.DataFrame
+    row_index: SelectionIndex
+    cube_index: SelectionIndex
+
+
+def prepare_campaign_data(df, metrics):
+    """Build the hourly cube and the selection indexes for a loaded feed."""
+    campaign_column = find_campaign_column(df)
+    # ``df`` is normally the hourly rollup already; regrouping it stays cheap
+    # and merges keys repeated across incrementally appended blocks.
+    with perf.stage("hourly cube", rows_in=df) as timing:
+        cube = timing.output(build_hourly_cube(df, campaign_column, metrics))
+    with perf.stage("selection indexes", rows_in=len(df) + len(cube)):
+        row_index, cube_index = SelectionIndex(df, campaign_column), SelectionIndex(cube, campaign_column)
+    return CampaignData(
+        df=df,
+        campaign_column=campaign_column,
+        cube=cube,
+        row_index=row_index,
+        cube_index=cube_index,
+    )
+
+
+def select_filtered(data, campaigns, dates):
+    """Cube slice and budget columns (None without Spend/Budget) of a selection."""
+    with perf.stage("filter", rows_in=data.cube) as timing:
+        cube_slice = timing.output(data.cube_index.select(data.cube, campaigns, dates))
+    df_budget = None
+    if 'Spend' in data.df.columns and 'Budget' in data.df.columns:
+        with perf.stage("budget", rows_in=data.df) as timing:
+            # Only the keys and budget inputs are gathered, not every column.
+            filtered = data.row_index.select(
+                data.df, campaigns, dates,
+                columns=filtered_columns(data.df, data.campaign_column, []),
+            )
+            df_budget = timing.output(budget_columns(filtered, data.campaign_column))
+    return cube_slice, df_budget
+
+
+def combined_hourly_trend(cube_slice, metrics):
+    """Metrics summed over all campaigns per date and hour."""
+    return cube_slice.groupby(HOUR_KEYS)[list(metrics)].sum().reset_index()
+
+
+def merge_amazon_sales(hourly, amazon_hourly):
+    """Left-join Amazon SP onto an hourly frame by date and hour (a no-op for None)."""
+    if amazon_hourly is None:
+        return hourly
+    return pd.merge(hourly, amazon_hourly, on=HOUR_KEYS, how='left')
+
+
+def combined_hourly_view(cube_slice, metrics, amazon_hourly=None):
+    """Combined trend with Amazon SP, date labels and ``<metric>_delta`` columns."""
+    with perf.stage("combined aggregation", rows_in=cube_slice) as timing:
+        combined = timing.output(combined_hourly_trend(cube_slice, metrics))
+    with perf.stage("merge", rows_in=combined) as timing:
+        combined = timing.output(merge_amazon_sales(combined, amazon_hourly))
+        combined['date'] = format_days(combined['date'])
+    with perf.stage("deltas, combined", rows_in=combined) as timing:
+        return timing.output(add_hourly_deltas(combined, ['date'], metrics, name="{}_delta"))
+
+
+def campaign_delta_view(cube_slice, campaign_column, metrics):
+    """Per campaign and date hourly ``<metric> Δ`` columns, with date labels."""
+    with perf.stage("deltas, campaign", rows_in=cube_slice) as timing:
+        deltas = add_hourly_deltas(cube_slice, [campaign_column, 'date'], metrics)
+        deltas['date'] = format_days(deltas['date'])
+        return timing.output(deltas)
+
+
+def delta_table(campaign_deltas, campaign_column, metrics):
+    """The delta columns of :func:`campaign_delta_view` with their keys."""
+    return campaign_deltas[[campaign_column] + HOUR_KEYS + [f"{m} Δ" for m in metrics]]
+
+
+def add_hourly_deltas(frame, group_columns, metrics, name="{} Δ"):
+    """Append the hour-over-hour change of every metric within each group.
+
+    The frame is sorted once by group and hour, then all metrics are
+    differenced together with a shifted NumPy subtraction. The first hour of a
+    group (or any NaN change) takes the metric's own value, matching
+    ``groupby(...).diff().fillna(value)`` run per metric. Delta columns are
+    named with ``name.format(metric)``.
+    """
+    metrics = list(metrics)
+    ordered = frame.sort_values(list(group_columns) + ['hour_index'], kind='stable').reset_index(drop=True)
+    values = ordered[metrics].to_numpy(dtype='float64')
+
+    deltas = np.full_like(values, np.nan)
+    deltas[1:] = values[1:] - values[:-1]
+    group_start = np.zeros(len(ordered), dtype=bool)
+    group_start[:1] = True
+    for column in group_columns:
+        keys = ordered[column]
+        keys = keys.cat.codes.to_numpy() if isinstance(keys.dtype, pd.CategoricalDtype) else keys.to_numpy()
+        group_start[1:] |= keys[1:] != keys[:-1]
+    deltas[group_start] = np.nan
+    deltas = np.where(np.isnan(deltas), values, deltas)
+
+    delta_frame = pd.DataFrame(deltas, columns=[name.format(m) for m in metrics], index=ordered.index)
+    return pd.concat([ordered, delta_frame], axis=1)
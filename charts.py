@@ -0,0 +1,264 @@
+"""Chart data shaping for the dashboard's Altair charts.
+
+Campaign-level charts are held to a row budget: only the top campaigns by the
+charted metric get their own series, the rest are summed into an "Other"
+series, and if many dates are selected each series is thinned with
+Largest-Triangle-Three-Buckets (LTTB) downsampling. This keeps the Vega specs
+small and under Altair's 5000-row limit.
+
+The chart builders hand Altair only the columns a chart encodes, compacted
+(float32 values, dictionary-encoded labels), and attach each dataset once per
+chart: Streamlit ships chart data as Arrow tables next to the spec, so every
+extra column or repeated label costs transport. Derived labels such as the
+"campaign | date" series key are computed in Vega instead of stored per row.
+"""
+import json
+import os
+
+import altair as alt
+
+import numpy as np
+import pandas as pd
+
+from campaign_core import add_hourly_deltas
+
+MAX_CHART_ROWS = int(os.environ.get("DASHBOARD_MAX_CHART_ROWS", "5000"))
+TOP_CAMPAIGNS = int(os.environ.get("DASHBOARD_TOP_CAMPAIGNS", "10"))
+OTHER = "Other"
+
+
+def lttb_indices(x, y, threshold):
+    """Positions of the ``threshold`` (>= 3) points LTTB keeps from the series (x, y)."""
+    n = len(x)
+    if threshold >= n:
+        return np.arange(n)
+    x = np.asarray(x, dtype='float64')
+    y = np.nan_to_num(np.asarray(y, dtype='float64'))
+    every = (n - 2) / (threshold - 2)
+    kept = [0]
+    a = 0
+    for i in range(threshold - 2):
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, n)
+        avg_x, avg_y = x[avg_start:avg_end].mean(), y[avg_start:avg_end].mean()
+        start, end = int(i * every) + 1, int((i + 1) * every) + 1
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        kept.append(a)
+    kept.append(n - 1)
+    return np.array(kept)
+
+
+def downsample_series(frame, series_columns, x, y, max_points):
+    """Thin every series of ``frame`` (sorted by series and ``x``) to ``max_points``."""
+    keep = []
+    for positions in frame.groupby(series_columns, sort=False, observed=True).indices.values():
+        if len(positions) <= max_points:
+            keep.append(positions)
+        else:
+            picked = lttb_indices(frame[x].to_numpy()[positions], frame[y].to_numpy()[positions], max_points)
+            keep.append(positions[picked])
+    return frame.take(np.sort(np.concatenate(keep))) if keep else frame
+
+
+def _campaigns_within_budget(totals, counts, slots, top_n, budget):
+    # Largest k <= top_n whose own rows plus one "Other" series fit the budget.
+    rows = counts.reindex(totals.index).cumsum().to_numpy()
+    k = min(top_n, len(totals))
+    while k > 1 and rows[k - 1] + (slots if k < len(totals) else 0) > budget:
+        k -= 1
+    return max(k, 1)
+
+
+def campaign_chart_data(deltas, campaign_column, metric, budget=MAX_CHART_ROWS, top_n=TOP_CAMPAIGNS):
+    """Rows for the campaign-level chart of ``metric``, within ``budget`` rows.
+
+    ``deltas`` is the campaign delta frame (``metric`` and ``"<metric> Δ"``
+    columns). Returns campaign, date, hour_index, ``metric`` and ``Delta``
+    columns, with the campaign column as plain strings.
+    """
+    frame = deltas[[campaign_column, 'date', 'hour_index', metric, f"{metric} Δ"]]
+    frame = frame.rename(columns={f"{metric} Δ": 'Delta'})
+
+    totals = frame.groupby(campaign_column, observed=True)[metric].sum().sort_values(ascending=False)
+    counts = frame.groupby(campaign_column, observed=True).size()
+    slots = frame[['date', 'hour_index']].drop_duplicates().shape[0]
+    keep = totals.index[:_campaigns_within_budget(totals, counts, slots, top_n, budget)]
+
+    in_top = frame[campaign_column].isin(keep)
+    top = frame[in_top].assign(**{campaign_column: frame.loc[in_top, campaign_column].astype(str)})
+    if in_top.all():
+        chart_data = top
+    else:
+        other = frame[~in_top].groupby(['date', 'hour_index'])[metric].sum().reset_index()
+        other = add_hourly_deltas(other, ['date'], [metric], name='Delta')
+        other.insert(0, campaign_column, OTHER)
+        chart_data = pd.concat([top, other], ignore_index=True)
+
+    return _downsample_to_budget(chart_data, campaign_column, budget).reset_index(drop=True)
+
+
+def _downsample_to_budget(chart_data, campaign_column, budget):
+    # Thin every campaign | date series evenly, keeping at least 3 points each.
+    if len(chart_data) <= budget:
+        return chart_data
+    series = [campaign_column, 'date']
+    n_series = chart_data[series].drop_duplicates().shape[0]
+    chart_data = chart_data.sort_values(series + ['hour_index'], kind='stable')
+    return downsample_series(chart_data, series, 'hour_index', 'Delta', max(3, budget // n_series))
+
+
+def chart_frame(frame, fields):
+    """The columns of ``frame`` a chart encodes, compacted for transport.
+
+    Missing fields are skipped, floats become float32 and string labels
+    Categorical, so Arrow stores each distinct label once.
+    """
+    columns = {}
+    for field in dict.fromkeys(fields):
+        if field not in frame.columns:
+            continue
+        column = frame[field]
+        if pd.api.types.is_float_dtype(column.dtype):
+            column = column.astype('float32')
+        elif pd.api.types.is_string_dtype(column.dtype):
+            column = column.astype('category')
+        columns[field] = column.reset_index(drop=True)
+    return pd.DataFrame(columns)
+
+
+def combined_trend_chart(combined_hourly, metric):
+    """Amazon SP bars under the hourly change of ``metric``, one color per date."""
+    delta = f"{metric}_delta"
+    data = chart_frame(combined_hourly, ['date', 'hour_index', 'SP', delta])
+    base = alt.Chart().encode(
+        x=alt.X('hour_index:O', title='Hour'),
+        color=alt.Color('date:N', legend=alt.Legend(title="Date")),
+    )
+    metric_line = base.mark_line(point=True).encode(
+        y=alt.Y(f"{delta}:Q", title=f"Hourly Change in {metric} / SP"),
+        tooltip=['date', 'hour_index', delta]
+    )
+    amazon_bar = base.mark_bar(opacity=0.3).encode(
+        y=alt.Y('SP:Q', stack=None),
+        tooltip=['date', 'hour_index', 'SP', delta]
+    )
+    # Both layers read the one top-level dataset.
+    return alt.layer(amazon_bar, metric_line, data=data)
+
+
+def campaign_change_chart(chart_data, campaign_column, metric):
+    """Hourly change of ``metric`` with one line per campaign and date.
+
+    ``chart_data`` is the output of :func:`campaign_chart_data`.
+    """
+    data = chart_frame(chart_data, [campaign_column, 'date', 'hour_index', 'Delta'])
+    campaign = f"datum[{json.dumps(campaign_column)}]"
+    return (
+        alt.Chart(data)
+        .transform_calculate(camp_date=f"{campaign} + ' | ' + datum.date")
+        .mark_line(point=True)
+        .encode(
+            x='hour_index:O',
+            y=alt.Y('Delta:Q', title=f"Hourly Change in {metric}"),
+            color=alt.Color('camp_date:N', legend=alt.Legend(title="Campaign | Date")),
+            tooltip=[campaign_column, 'date', 'hour_index', 'Delta']
+        )
+        .properties(title=f"Hourly Change in {metric} by Campaign & Date", height=300)
+    )
+
+
+def amazon_sales_chart(amazon_hourly):
+    """Total hourly Amazon SP as bars colored by date."""
+    data = chart_frame(amazon_hourly, ['date', 'hour_index', 'SP'])
+    return alt.Chart(data).mark_bar().encode(
+        x='hour_index:O',
+        y='SP:Q',
+        color='date:N',
+        tooltip=['date', 'hour_index', 'SP']
+    ).properties(title="Total Hourly SP from Amazon Data", height=300)
+
+
+def metric_param(metrics):
+    """A dropdown parameter choosing which of ``metrics`` a chart shows."""
+    return alt.param(name='metric', value=metrics[0], bind=alt.binding_select(options=list(metrics), name="Metric "))
+
+
+def combined_trend_metrics_chart(combined_hourly, metrics):
+    """All ``metrics`` of the combined trend in one chart with a metric dropdown.
+
+    The delta columns are melted into long format (``metric``, ``delta``) so
+    a single dataset backs every metric.
+    """
+    metrics = list(metrics)
+    data = chart_frame(combined_hourly, ['date', 'hour_index', 'SP'] + [f"{m}_delta" for m in metrics])
+    data = data.rename(columns={f"{m}_delta": m for m in metrics})
+    data = data.melt(id_vars=[c for c in data.columns if c not in metrics], var_name='metric', value_name='delta')
+    data['metric'] = data['metric'].astype('category')
+
+    selected = metric_param(metrics)
+    base = alt.Chart().transform_filter(alt.datum.metric == selected).encode(
+        x=alt.X('hour_index:O', title='Hour'),
+        color=alt.Color('date:N', legend=alt.Legend(title="Date")),
+    )
+    metric_line = base.mark_line(point=True).encode(
+        y=alt.Y('delta:Q', title="Hourly Change in Metric / SP"),
+        tooltip=['metric', 'date', 'hour_index', 'delta']
+    )
+    amazon_bar = base.mark_bar(opacity=0.3).encode(
+        y=alt.Y('SP:Q', stack=None),
+        tooltip=['metric', 'date', 'hour_index', 'SP', 'delta']
+    )
+    return alt.layer(amazon_bar, metric_line, data=data).add_params(selected)
+
+
+def campaign_metrics_chart_data(deltas, campaign_column, metrics, budget=MAX_CHART_ROWS, top_n=TOP_CAMPAIGNS):
+    """:func:`campaign_chart_data` of every metric, stacked with a ``metric`` column.
+
+    The metrics share one chart, so they share ``budget`` in equal parts. Each
+    metric keeps the campaigns it would get in a chart of its own and its
+    series are thinned to fit its share. Only when even three points per
+    series do not fit are more campaigns folded into "Other"; those metrics
+    are listed in ``attrs['fewer_campaigns']`` of the result.
+    """
+    per_metric = budget // max(len(metrics), 1)
+    # Campaigns (plus "Other") whose series fit the share at three points each.
+    min_points = 3 * max(deltas['date'].nunique(), 1)
+    fewer_top_n = max(1, min(top_n, per_metric // min_points - 1))
+    frames, fewer_campaigns = [], []
+    for metric in metrics:
+        chart_data = _downsample_to_budget(
+            campaign_chart_data(deltas, campaign_column, metric, budget, top_n), campaign_column, per_metric)
+        if len(chart_data) > per_metric and fewer_top_n < top_n:
+            chart_data = _downsample_to_budget(
+                campaign_chart_data(deltas, campaign_column, metric, budget, fewer_top_n), campaign_column, per_metric)
+            fewer_campaigns.append(metric)
+        frames.append(chart_data.drop(columns=metric).assign(metric=metric))
+    chart_data = pd.concat(frames, ignore_index=True)
+    chart_data['metric'] = chart_data['metric'].astype('category')
+    chart_data.attrs['fewer_campaigns'] = fewer_campaigns
+    return chart_data
+
+
+def campaign_change_metrics_chart(chart_data, campaign_column, metrics):
+    """All ``metrics`` of the campaign section in one chart with a metric dropdown.
+
+    ``chart_data`` is the output of :func:`campaign_metrics_chart_data`.
+    """
+    data = chart_frame(chart_data, ['metric', campaign_column, 'date', 'hour_index', 'Delta'])
+    campaign = f"datum[{json.dumps(campaign_column)}]"
+    selected = metric_param(metrics)
+    return (
+        alt.Chart(data)
+        .transform_filter(alt.datum.metric == selected)
+        .transform_calculate(camp_date=f"{campaign} + ' | ' + datum.date")
+        .mark_line(point=True)
+        .encode(
+            x='hour_index:O',
+            y=alt.Y('Delta:Q', title="Hourly Change in Metric"),
+            color=alt.Color('camp_date:N', legend=alt.Legend(title="Campaign | Date")),
+            tooltip=['metric', campaign_column, 'date', 'hour_index', 'Delta']
+        )
+        .add_params(selected)
+        .properties(title="Hourly Change by Campaign & Date", height=300)
+    )
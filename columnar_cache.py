@@ -0,0 +1,69 @@
+"""On-disk Arrow (Feather v2) cache of the post-processed frames.
+
+Frames are written uncompressed so a fresh process can memory-map them back
+instead of re-parsing the CSV. Entries are keyed on a fingerprint of the
+source and of the parse configuration (columns, dtypes, formats, engine);
+bump ``CACHE_VERSION`` whenever the parsing/post-processing code changes the
+shape or dtypes of the cached frames.
+"""
+import glob
+import hashlib
+import os
+
+from atomic_write import write_atomic
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow is optional; without it nothing is cached
+    feather = None
+
+CACHE_VERSION = 5
+
+
+def fingerprint(*parts):
+    """Stable cache key for the given source description."""
+    digest = hashlib.sha256(repr((CACHE_VERSION,) + parts).encode("utf-8"))
+    return digest.hexdigest()[:24]
+
+
+def _path(cache_dir, name, key):
+    return os.path.join(cache_dir, f"{name}-{key}.arrow")
+
+
+def load(cache_dir, name, key):
+    """The cached frame for ``name``/``key``, or None on a miss."""
+    path = _path(cache_dir, name, key)
+    if feather is None or not os.path.exists(path):
+        return None
+    try:
+        return feather.read_table(path, memory_map=True).to_pandas()
+    except (OSError, ValueError):
+        return None
+
+
+def store(cache_dir, name, key, frame):
+    """Persist ``frame`` and drop older entries for ``name``."""
+    if feather is None:
+        return
+    path = _path(cache_dir, name, key)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        write_atomic(path, lambda f: feather.write_feather(frame, f, compression="uncompressed"))
+    except (OSError, TypeError, ValueError):
+        # Columns Arrow cannot represent (e.g. mixed object values) are simply not cached.
+        return
+    for stale in glob.glob(_path(cache_dir, name, "*")):
+        if stale != path:
+            try:
+                os.remove(stale)
+            except FileNotFoundError:  # already removed by another process
+                pass
+
+
+def cached_frame(cache_dir, name, key, build):
+    """Load ``name``/``key`` from the cache, or ``build()`` it and store it."""
+    frame = load(cache_dir, name, key)
+    if frame is None:
+        frame = build()
+        store(cache_dir, name, key, frame)
+    return frame
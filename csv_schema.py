@@ -0,0 +1,132 @@
+"""Column registry and reader for the report CSVs.
+
+Each report declares the columns the dashboard reads and their dtypes, so
+other columns are never parsed and numeric columns land as float32 instead of
+inferred float64/int64/object.
+
+Files are parsed with the multithreaded pyarrow CSV reader when it is
+available (``DASHBOARD_CSV_ENGINE=pyarrow``, the default), falling back to the
+pandas C engine for anything pyarrow rejects. ``DASHBOARD_CSV_ENGINE=c``
+always uses the C engine.
+"""
+import os
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pyarrow is optional; the C engine is used without it
+    pa = pa_csv = None
+
+CSV_ENGINE = os.environ.get("DASHBOARD_CSV_ENGINE", "pyarrow")
+
+
+@dataclass(frozen=True)
+class CsvSchema:
+    """Columns of a report that are read, with their dtypes.
+
+    ``columns`` maps a column name to its dtype, or None to let pandas infer
+    it. Columns listed here but missing from a file are skipped. Columns whose
+    name satisfies ``match`` are read as well, with dtype ``match_dtype``.
+    """
+    columns: dict
+    parse_dates: tuple = ()
+    match: Optional[Callable[[str], bool]] = None
+    match_dtype: Optional[str] = None
+
+    def dtype_of(self, column):
+        if column in self.columns:
+            return self.columns[column]
+        return self.match_dtype
+
+    def reads(self, column):
+        return column in self.columns or (self.match is not None and self.match(column))
+
+    def key(self):
+        """Hashable description of what this schema reads, for cache keys."""
+        match = None if self.match is None else f"{self.match.__module__}.{self.match.__qualname__}"
+        return (tuple(sorted(self.columns.items())), tuple(self.parse_dates), match, self.match_dtype)
+
+
+def _is_campaign_column(column):
+    return 'campaign' in column.lower()
+
+
+def spend_schema(metrics):
+    """Schema of spend_master.csv for the given metric columns."""
+    # timestamp is read dictionary-encoded and parsed per distinct value
+    # (see timestamps.parse_timestamps).
+    columns = {'timestamp': 'category', 'Budget': 'float32'}
+    columns.update({metric: 'float32' for metric in metrics})
+    return CsvSchema(
+        columns=columns,
+        match=_is_campaign_column,
+        match_dtype='category',
+    )
+
+
+AMAZON_SCHEMA = CsvSchema(columns={'Date': 'category', 'Hour': 'float32', 'SP': 'float32'})
+
+
+def _rewind(source):
+    if hasattr(source, 'seek'):
+        source.seek(0)
+
+
+def _arrow_type(dtype):
+    if dtype == 'category':
+        return pa.dictionary(pa.int32(), pa.string())
+    return pa.from_numpy_dtype(pd.api.types.pandas_dtype(dtype))
+
+
+def _read_with_pyarrow(source, usecols, dtypes, parse_dates):
+    column_types = {column: _arrow_type(dtype) for column, dtype in dtypes.items()}
+    column_types.update({column: pa.timestamp('ns') for column in parse_dates})
+    # Blank cells are missing values, as in the C engine, not empty strings.
+    convert_options = pa_csv.ConvertOptions(
+        include_columns=usecols, column_types=column_types,
+        strings_can_be_null=True, quoted_strings_can_be_null=True,
+    )
+    read_options = pa_csv.ReadOptions(use_threads=True)
+    table = pa_csv.read_csv(source, read_options=read_options, convert_options=convert_options)
+    return table.to_pandas()
+
+
+def _read_with_pandas(source, usecols, dtypes, parse_dates):
+    try:
+        return pd.read_csv(source, usecols=usecols, dtype=dtypes, parse_dates=parse_dates)
+    except ValueError:
+        _rewind(source)
+
+    frame = pd.read_csv(source, usecols=usecols, parse_dates=parse_dates)
+    for column, dtype in dtypes.items():
+        if pd.api.types.is_numeric_dtype(pd.api.types.pandas_dtype(dtype)):
+            frame[column] = pd.to_numeric(frame[column], errors='coerce').astype(dtype)
+        else:
+            frame[column] = frame[column].astype(dtype)
+    return frame
+
+
+def read_report_csv(source, schema, parse_dates=None, engine=None):
+    """Read the columns of ``schema`` from a CSV path or file-like object.
+
+    ``parse_dates`` overrides ``schema.parse_dates`` and ``engine`` overrides
+    ``CSV_ENGINE``. A value that does not fit its declared numeric dtype
+    becomes NaN, like ``pd.to_numeric(errors='coerce')``.
+    """
+    header = pd.read_csv(source, nrows=0).columns
+    _rewind(source)
+    usecols = [column for column in header if schema.reads(column)]
+    dtypes = {column: schema.dtype_of(column) for column in usecols if schema.dtype_of(column)}
+    parse_dates = [c for c in (schema.parse_dates if parse_dates is None else parse_dates) if c in usecols]
+
+    if (engine or CSV_ENGINE) == 'pyarrow' and pa_csv is not None:
+        try:
+            return _read_with_pyarrow(source, usecols, dtypes, parse_dates)
+        except (pa.ArrowException, TypeError):
+            # e.g. a non-ISO timestamp or a non-numeric value in a numeric column
+            _rewind(source)
+    return _read_with_pandas(source, usecols, dtypes, parse_dates)
@@ -0,0 +1,235 @@
+"""Fetching of the remote report CSVs.
+
+Downloads are kept on local disk together with the ETag / Last-Modified
+validators of the response, so later fetches are conditional requests and an
+unchanged report (304) is served from disk, or from the already-parsed frame
+when this process has parsed it before. Parsed frames are also persisted in
+columnar form (see ``columnar_cache``) so a fresh process can skip parsing.
+
+Append-only reports can instead be ingested incrementally: only the bytes past
+the last consumed line are read (HTTP Range or a local seek) and parsed.
+"""
+import hashlib
+import io
+import json
+import os
+import shutil
+import threading
+import urllib.error
+import urllib.request
+from dataclasses import dataclass
+from typing import Optional
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+import columnar_cache
+import perf
+from atomic_write import write_atomic
+
+CACHE_DIR = os.environ.get("DASHBOARD_CACHE_DIR", ".dashboard_cache")
+FETCH_TIMEOUT_SECONDS = 60
+
+_lock = threading.Lock()
+_frames = {}  # (url, parse_key) -> ((etag, last_modified), parsed frame)
+_tails = {}  # source -> _TailState
+
+
+@dataclass
+class FetchResult:
+    path: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    not_modified: bool
+
+    @property
+    def validators(self):
+        return (self.etag, self.last_modified)
+
+
+def _url_stem(url):
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+
+
+def _cache_paths(url, cache_dir):
+    stem = _url_stem(url)
+    return os.path.join(cache_dir, stem + ".csv"), os.path.join(cache_dir, stem + ".json")
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def fetch(url, cache_dir=CACHE_DIR, timeout=FETCH_TIMEOUT_SECONDS):
+    """Download ``url`` into ``cache_dir``, revalidating any earlier copy.
+
+    Returns a :class:`FetchResult` pointing at the local copy. ``not_modified``
+    is set when the server answered 304 and the copy on disk was reused.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    body_path, meta_path = _cache_paths(url, cache_dir)
+    meta = _read_meta(meta_path) if os.path.exists(body_path) else {}
+
+    request = urllib.request.Request(url)
+    if meta.get("etag"):
+        request.add_header("If-None-Match", meta["etag"])
+    if meta.get("last_modified"):
+        request.add_header("If-Modified-Since", meta["last_modified"])
+
+    try:
+        with perf.stage("fetch"), urllib.request.urlopen(request, timeout=timeout) as response:
+            write_atomic(body_path, lambda f: shutil.copyfileobj(response, f))
+            meta = {
+                "url": url,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+    except urllib.error.HTTPError as e:
+        if e.code != 304 or not meta:
+            raise
+        return FetchResult(body_path, meta.get("etag"), meta.get("last_modified"), True)
+
+    write_atomic(meta_path, lambda f: f.write(json.dumps(meta).encode("utf-8")))
+    return FetchResult(body_path, meta["etag"], meta["last_modified"], False)
+
+
+def load_remote_frame(url, parse, cache_dir=CACHE_DIR, parse_key=None):
+    """Return ``parse(local_path)`` for ``url``, skipping work when unchanged.
+
+    ``parse_key`` describes everything that shapes what ``parse`` returns
+    (columns, dtypes, formats, CSV engine); frames parsed under a different
+    key are never reused. The parsed frame is kept per URL and key and
+    returned as-is while the server keeps answering 304 with the same
+    validators, so callers must not mutate it. Otherwise it is read from the
+    columnar cache when the downloaded copy is unchanged, and only parsed from
+    CSV as a last resort.
+    """
+    with _lock:
+        result = fetch(url, cache_dir)
+        cached = _frames.get((url, parse_key))
+        if result.not_modified and cached is not None and cached[0] == result.validators:
+            return cached[1]
+        stat = os.stat(result.path)
+        key = columnar_cache.fingerprint(url, parse_key, result.validators, stat.st_size, stat.st_mtime_ns)
+        frame = columnar_cache.cached_frame(cache_dir, _url_stem(url), key, lambda: parse(result.path))
+        _frames[(url, parse_key)] = (result.validators, frame)
+        return frame
+
+
+@dataclass
+class _TailState:
+    header: bytes
+    offset: int  # end of the last newline-terminated line parsed
+    last_timestamp: pd.Timestamp
+    frame: pd.DataFrame
+
+
+def _is_url(source):
+    return source.startswith(("http://", "https://"))
+
+
+def _read_all(source, timeout=FETCH_TIMEOUT_SECONDS):
+    # No revalidation here: a full reload means the file is known to have changed.
+    if _is_url(source):
+        with perf.stage("fetch"), urllib.request.urlopen(source, timeout=timeout) as response:
+            return response.read()
+    with open(source, "rb") as f:
+        return f.read()
+
+
+def _read_range(source, start, end=None, timeout=FETCH_TIMEOUT_SECONDS):
+    """Bytes ``start..end`` (inclusive) of ``source``, or None if unavailable."""
+    if not _is_url(source):
+        with open(source, "rb") as f:
+            f.seek(start)
+            return f.read() if end is None else f.read(end - start + 1)
+
+    byte_range = f"bytes={start}-" + ("" if end is None else str(end))
+    request = urllib.request.Request(source, headers={"Range": byte_range})
+    try:
+        with perf.stage("fetch (range)"), urllib.request.urlopen(request, timeout=timeout) as response:
+            # A 200 means the server ignored the Range header.
+            return response.read() if response.status == 206 else None
+    except urllib.error.HTTPError as e:
+        if e.code == 416:
+            return None
+        raise
+
+
+def _append(frame, rows):
+    # Plain concat turns categoricals with different categories into objects.
+    combined = pd.concat([frame, rows], ignore_index=True)
+    for column in frame.columns:
+        if isinstance(frame[column].dtype, pd.CategoricalDtype) and column in rows:
+            if not isinstance(combined[column].dtype, pd.CategoricalDtype):
+                added = rows[column]
+                if len(added.cat.categories) == 0:
+                    # All missing: no categories, and not even of the frame's dtype.
+                    added = added.cat.set_categories(frame[column].cat.categories)
+                combined[column] = union_categoricals([frame[column], added], sort_categories=True)
+    return combined
+
+
+def _parse_lines(parse, header, lines):
+    return parse(io.BytesIO(header + lines))
+
+
+def _full_load(source, parse, timestamp_column):
+    data = _read_all(source)
+    header_end = data.find(b"\n") + 1
+    offset = max(data.rfind(b"\n") + 1, header_end)
+    header = data[:header_end]
+    frame = _parse_lines(parse, header, data[header_end:offset])
+    return _TailState(header, offset, frame[timestamp_column].max(), frame)
+
+
+def _tail_load(state, source, parse, timestamp_column):
+    """Advance ``state`` past newly appended rows, or None if a reload is needed.
+
+    An unterminated last line is left for a later call: the writer may be
+    halfway through it, and a partial row can fail to parse or parse wrong.
+    """
+    if _read_range(source, 0, len(state.header) - 1) != state.header:
+        return None
+    # Start one byte early: the newline that ended the last consumed line must
+    # still be there, otherwise the file was truncated or rewritten.
+    tail = _read_range(source, state.offset - 1)
+    if not tail or tail[:1] != b"\n":
+        return None
+    tail = tail[1:]
+    complete = tail.rfind(b"\n") + 1
+    if complete == 0:
+        return state
+
+    new_rows = _parse_lines(parse, state.header, tail[:complete])
+    if len(new_rows) == 0:
+        return _TailState(state.header, state.offset + complete, state.last_timestamp, state.frame)
+    if new_rows[timestamp_column].min() < state.last_timestamp:
+        return None
+    frame = _append(state.frame, new_rows)
+    return _TailState(state.header, state.offset + complete, new_rows[timestamp_column].max(), frame)
+
+
+def load_incremental_frame(source, parse, timestamp_column="timestamp"):
+    """Return ``parse`` applied to an append-only CSV, reading only new bytes.
+
+    ``source`` is a URL or a local path and ``parse`` is called on a file-like
+    object holding the header plus a block of complete rows. Only the rows
+    appended since the previous call are parsed; a last line without its
+    newline is not read until it is finished. A full reload happens if the
+    file shrank, its header changed, or new rows are older than the last
+    timestamp seen. The returned frame is shared between calls and must not be
+    mutated.
+    """
+    with _lock:
+        state = _tails.get(source)
+        if state is not None:
+            state = _tail_load(state, source, parse, timestamp_column)
+        if state is None:
+            state = _full_load(source, parse, timestamp_column)
+        _tails[source] = state
+        return state.frame
@@ -0,0 +1,136 @@
+"""Per-stage timing of dashboard reruns and data loads.
+
+Code on the hot path wraps each stage in ``with perf.stage(name):``. Stages
+are recorded into the recorder that is active in the current context (see
+:func:`recording`), with wall time, rows in and out, and the change in the
+process' resident memory; with no active recorder a stage costs one context
+variable lookup. The recorders are plain data and export as JSON.
+"""
+import contextvars
+import json
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import List, Optional
+
+_active = contextvars.ContextVar("perf_recorder", default=None)
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _rss_bytes():
+    # Linux only; elsewhere the memory delta is left empty.
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def rows_of(value):
+    """Row count of a frame (or anything sized), passed-through ints, else None."""
+    if value is None or isinstance(value, int):
+        return value
+    try:
+        return len(value)
+    except TypeError:
+        return None
+
+
+@dataclass
+class StageRecord:
+    name: str
+    seconds: float = 0.0
+    rows_in: Optional[int] = None
+    rows_out: Optional[int] = None
+    memory_delta: Optional[int] = None  # bytes of resident memory
+
+    def output(self, value):
+        """Record the rows of ``value`` as this stage's output and return it."""
+        self.rows_out = rows_of(value)
+        return value
+
+
+@dataclass
+class Recorder:
+    """Stages of one run, in the order they finished.
+
+    ``wall_seconds`` is the run's own wall time, from creation to
+    :meth:`finish`; it also covers work outside the instrumented stages.
+    """
+    label: str = ""
+    started: float = field(default_factory=time.time)
+    stages: List[StageRecord] = field(default_factory=list)
+    wall_seconds: Optional[float] = None
+    _clock: float = field(default_factory=time.perf_counter, repr=False)
+
+    @property
+    def stage_seconds(self):
+        return sum(s.seconds for s in self.stages)
+
+    def finish(self):
+        """Record the wall time since the recorder was created."""
+        self.wall_seconds = time.perf_counter() - self._clock
+        return self
+
+    def to_dict(self):
+        return {
+            "label": self.label,
+            "started": self.started,
+            "wall_seconds": self.wall_seconds,
+            "stages": [asdict(s) for s in self.stages],
+        }
+
+
+@contextmanager
+def recording(label=""):
+    """Record the stages run inside the block into a new :class:`Recorder`.
+
+    The recorder is finished when the block exits.
+    """
+    recorder = Recorder(label)
+    token = _active.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _active.reset(token)
+        recorder.finish()
+
+
+def start_recording(label=""):
+    """Make a new recorder active for the rest of the current context.
+
+    For top-level script code that cannot wrap itself in :func:`recording`;
+    call the recorder's ``finish`` at the end of the run.
+    """
+    recorder = Recorder(label)
+    _active.set(recorder)
+    return recorder
+
+
+@contextmanager
+def stage(name, rows_in=None):
+    """Time the block as stage ``name`` of the active recorder.
+
+    Yields a :class:`StageRecord`; call its ``output`` to record rows out.
+    """
+    record = StageRecord(name, rows_in=rows_of(rows_in))
+    recorder = _active.get()
+    if recorder is None:
+        yield record
+        return
+    rss_before = _rss_bytes()
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record.seconds = time.perf_counter() - start
+        rss_after = _rss_bytes()
+        if rss_before is not None and rss_after is not None:
+            record.memory_delta = rss_after - rss_before
+        recorder.stages.append(record)
+
+
+def to_json(recorders):
+    """JSON export of several recorders (None entries are skipped)."""
+    return json.dumps([r.to_dict() for r in recorders if r is not None], indent=2)
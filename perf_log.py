@@ -0,0 +1,106 @@
+"""Opt-in JSON-lines log of dashboard rerun latency.
+
+With ``DASHBOARD_PERF_LOG`` set to a file path, every rerun appends one JSON
+object: its kind (``full`` script run or ``fragment`` rerun), its wall time
+(``seconds``), the time spent in instrumented stages, per-stage timings with
+row counts, the selection sizes, the data size and the
+result cache counters. The file rotates at ``DASHBOARD_PERF_LOG_MB``
+megabytes, keeping ``DASHBOARD_PERF_LOG_BACKUPS`` old files. Rotation is per
+process: give each server process its own path.
+
+Latency percentiles over one or more log files:
+
+    python perf_log.py dashboard_perf.jsonl [dashboard_perf.jsonl.1 ...]
+"""
+import argparse
+import json
+import logging
+import logging.handlers
+import os
+import time
+from collections import defaultdict
+
+import numpy as np
+
+PERF_LOG_PATH = os.environ.get("DASHBOARD_PERF_LOG") or None
+PERF_LOG_MAX_MB = int(os.environ.get("DASHBOARD_PERF_LOG_MB", "10"))
+PERF_LOG_BACKUPS = int(os.environ.get("DASHBOARD_PERF_LOG_BACKUPS", "5"))
+
+
+class PerfLog:
+    """Appends rerun records to a rotating JSON-lines file."""
+
+    def __init__(self, path, max_bytes=PERF_LOG_MAX_MB * 2**20, backups=PERF_LOG_BACKUPS):
+        self.path = path
+        self._logger = logging.getLogger(f"{__name__}.{os.path.abspath(path)}")
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+        if not self._logger.handlers:
+            handler = logging.handlers.RotatingFileHandler(
+                path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self._logger.addHandler(handler)
+
+    def write(self, record):
+        self._logger.info(json.dumps(record, default=str))
+
+
+def rerun_record(kind, seconds, recorders, **fields):
+    """One log record for a rerun of ``seconds`` wall time made of the stages of ``recorders``."""
+    stages = [
+        {"run": recorder.label, **stage}
+        for recorder in recorders if recorder is not None
+        for stage in recorder.to_dict()["stages"]
+    ]
+    return {
+        "ts": time.time(),
+        "kind": kind,
+        "seconds": seconds,
+        "stage_seconds": sum(s["seconds"] for s in stages),
+        "stages": stages,
+        **fields,
+    }
+
+
+def read_records(paths):
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def summarize(records):
+    """p50/p95/max seconds per rerun kind and per stage, with counts."""
+    samples = defaultdict(list)
+    for record in records:
+        samples[("rerun", record["kind"])].append(record["seconds"])
+        for stage in record["stages"]:
+            samples[("stage", stage["name"])].append(stage["seconds"])
+    summary = []
+    for (group, name), values in sorted(samples.items()):
+        values = np.asarray(values)
+        summary.append({
+            "group": group,
+            "name": name,
+            "count": len(values),
+            "p50": float(np.percentile(values, 50)),
+            "p95": float(np.percentile(values, 95)),
+            "max": float(values.max()),
+        })
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency percentiles from dashboard perf logs.")
+    parser.add_argument("paths", nargs="+")
+    args = parser.parse_args()
+
+    print(f"{'group':>6} {'name':>32} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for row in summarize(read_records(args.paths)):
+        print(f"{row['group']:>6} {row['name']:>32} {row['count']:>6} "
+              f"{row['p50'] * 1e3:>9.1f} {row['p95'] * 1e3:>9.1f} {row['max'] * 1e3:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""One-shot cProfile capture of a dashboard rerun.
+
+The script starts a profiler at the top of a run it was asked to profile and
+finishes it at the end. The result keeps the raw stats, in the ``.prof``
+format ``pstats``/snakeviz read, and the top functions by cumulative time for
+display. Up to Python 3.11 only the script thread is profiled; from 3.12
+cProfile is built on ``sys.monitoring``, so the profile also covers whatever
+other threads (e.g. the background refresher) run meanwhile, and only one
+profiler can be active per process.
+
+A run that is cut short (an exception, ``st.stop``, or a rerun requested
+mid-run) never reaches :func:`finish`; the script keeps the running profiler
+in session state and stops it with :func:`discard` at the start of the next
+run.
+"""
+import cProfile
+import marshal
+import os
+import pstats
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+TOP_FUNCTIONS = 30
+
+
+@dataclass(frozen=True)
+class ProfileResult:
+    captured_at: float
+    seconds: float
+    prof: bytes
+    top: List[dict]
+
+
+def start():
+    """A running profiler, or None if another profiler is active (Python 3.12+)."""
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        return None
+    profiler.started = time.perf_counter()
+    return profiler
+
+
+def top_functions(stats, limit=TOP_FUNCTIONS):
+    """The ``limit`` functions with the highest cumulative time."""
+    stats.sort_stats(pstats.SortKey.CUMULATIVE)
+    rows = []
+    for func in stats.fcn_list[:limit]:
+        primitive_calls, calls, own_time, cumulative_time, _ = stats.stats[func]
+        file_name, line, name = func
+        where = name if file_name == "~" else f"{name} ({os.path.basename(file_name)}:{line})"
+        rows.append({
+            "function": where,
+            "calls": calls,
+            "primitive calls": primitive_calls,
+            "own s": own_time,
+            "cumulative s": cumulative_time,
+        })
+    return rows
+
+
+def discard(profiler):
+    """Stop ``profiler`` (from :func:`start`) without collecting a result."""
+    if profiler is not None:
+        profiler.disable()
+
+
+def finish(profiler, limit=TOP_FUNCTIONS) -> Optional[ProfileResult]:
+    """Stop ``profiler`` (from :func:`start`) and collect its result."""
+    if profiler is None:
+        return None
+    profiler.disable()
+    seconds = time.perf_counter() - profiler.started
+    stats = pstats.Stats(profiler)
+    # Same bytes as Stats.dump_stats would write to a .prof file.
+    return ProfileResult(time.time(), seconds, marshal.dumps(stats.stats), top_functions(stats, limit))
@@ -0,0 +1,114 @@
+"""Process-wide background refresh of the dashboard's remote data.
+
+One daemon thread per server process reloads the remote reports on a fixed
+interval and swaps in a new immutable snapshot. Sessions only ever read the
+current snapshot, so a rerun never waits on the network or on parsing, and all
+sessions share a single copy of the frames.
+
+Sources (e.g. ``"campaign"``, ``"amazon"``) are loaded on first use: a
+session that brings its own file for one report never waits on the other.
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import pandas as pd
+
+import perf
+from campaign_core import CampaignData
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class DatasetSnapshot:
+    """Frames shared by every session. Treat them as read-only.
+
+    A frame is None until its source has been required.
+    """
+    campaign: Optional[CampaignData]
+    amazon_hourly: Optional[pd.DataFrame]
+    loaded_at: float
+
+
+class DatasetRefresher:
+    """Keeps a :class:`DatasetSnapshot` fresh from a daemon thread.
+
+    ``load`` receives the current snapshot (None on the first call) and the
+    set of sources to load, and returns the next snapshot; it may return the
+    same object when nothing changed. Sources join the refresh through
+    :meth:`require`.
+    """
+
+    def __init__(self, load, interval):
+        self._load = load
+        self.interval = interval
+        self._snapshot = None
+        self._sources = frozenset()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_error = None
+        self.last_timings = None
+
+    @property
+    def snapshot(self):
+        return self._snapshot
+
+    def _refresh(self, sources):
+        # Rebinding the attribute is atomic: readers see the old snapshot or
+        # the new one, never a partially built one.
+        with perf.recording("background load") as timings:
+            self._snapshot = self._load(self._snapshot, sources)
+        self._sources = sources
+        self.last_timings = timings
+        return self._snapshot
+
+    def refresh(self):
+        with self._lock:
+            return self._refresh(self._sources)
+
+    def require(self, sources):
+        """The current snapshot, after loading any of ``sources`` it lacks.
+
+        The missing sources are loaded synchronously and refreshed in the
+        background from then on.
+        """
+        sources = frozenset(sources)
+        if not sources <= self._sources:
+            with self._lock:
+                if not sources <= self._sources:
+                    self._refresh(self._sources | sources)
+        self.start()
+        return self._snapshot
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh()
+                self.last_error = None
+            except Exception as e:  # keep serving the previous snapshot
+                logger.exception("Background refresh failed")
+                self.last_error = e
+
+    def start(self):
+        """Refresh the required sources in the background from now on."""
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="dataset-refresher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+def snapshot_of(campaign, amazon_hourly, previous=None):
+    """A new snapshot, or ``previous`` itself when neither frame changed."""
+    if previous is not None and previous.campaign is campaign and previous.amazon_hourly is amazon_hourly:
+        return previous
+    return DatasetSnapshot(campaign, amazon_hourly, time.time())
@@ -0,0 +1,88 @@
+"""In-process LRU cache of per-selection dashboard results.
+
+Analysts tend to flip between a few filter combinations. The frames computed
+for a (campaigns, dates, metrics) selection are kept in memory, keyed on a
+canonical hash of the selection, and the least recently used entries are
+evicted once their total size passes a byte budget. Unlike ``st.cache_data``
+entries are not pickled: hits hand back the stored frames themselves, so
+callers must treat them as read-only.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def selection_key(data_version, campaigns, dates, metrics):
+    """Canonical hash of a selection: the order values were picked in is ignored."""
+    canonical = [
+        data_version,
+        sorted(str(c) for c in campaigns),
+        sorted(int(d) for d in dates),
+        sorted(metrics),
+    ]
+    return hashlib.sha256(json.dumps(canonical, default=str).encode("utf-8")).hexdigest()
+
+
+def _size_of(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, (tuple, list)):
+        return sum(_size_of(v) for v in value)
+    if isinstance(value, dict):
+        return sum(_size_of(v) for v in value.values())
+    return 0
+
+
+class ResultCache:
+    """Least-recently-used cache holding at most ``max_bytes`` of frames.
+
+    Sizes are measured with ``memory_usage(deep=True)`` when an entry is
+    stored. An entry larger than the whole budget is returned but not kept.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+
+        # Computed outside the lock; two sessions missing on the same key at
+        # once both compute it and the last one stored wins.
+        value = compute()
+        size = _size_of(value)
+        if size > self.max_bytes:
+            return value
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
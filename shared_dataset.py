@@ -0,0 +1,166 @@
+"""Dataset snapshots shared between Streamlit server processes on one host.
+
+One process (whichever holds the publisher lock) loads the reports and
+publishes each new snapshot into a directory, ideally on a tmpfs such as
+/dev/shm: the frames as uncompressed Arrow IPC files and the selection
+indexes as ``.npy`` arrays. Every process, the publisher included, attaches to
+the latest version through memory maps, so numeric columns and index arrays
+are backed by the same pages in all processes instead of one copy each.
+"""
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pyarrow as pa
+
+from campaign_core import CampaignData, SelectionIndex
+from refresher import DatasetSnapshot
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+CURRENT = "CURRENT"
+ATTACH_TIMEOUT_SECONDS = 120
+
+
+def _write_table(path, frame):
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _read_table(path):
+    # split_blocks lets numeric columns without nulls stay on the mapped pages.
+    table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def _write_index(directory, name, index):
+    for key, array in index.to_arrays().items():
+        np.save(os.path.join(directory, f"{name}.{key}.npy"), array)
+
+
+def _read_index(directory, name, campaigns):
+    arrays = {}
+    for file_name in os.listdir(directory):
+        if file_name.startswith(name + ".") and file_name.endswith(".npy"):
+            key = file_name[len(name) + 1:-len(".npy")]
+            arrays[key] = np.load(os.path.join(directory, file_name), mmap_mode="r")
+    return SelectionIndex.from_arrays(campaigns, arrays)
+
+
+class SharedDataset:
+    """A directory of published snapshot versions plus the publisher lock."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock_file = None
+
+    def try_acquire_publisher(self):
+        """True if this process is (now) the one that loads and publishes."""
+        if self._lock_file is not None:
+            return True
+        lock_file = open(os.path.join(self.directory, "publisher.lock"), "a+b")
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file  # held for the life of the process
+        return True
+
+    def current_version(self):
+        try:
+            with open(os.path.join(self.directory, CURRENT), encoding="utf-8") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def publish(self, snapshot):
+        """Write ``snapshot`` as a new version and make it current."""
+        version = f"v{time.time_ns()}"
+        target = os.path.join(self.directory, version)
+        os.makedirs(target)
+        campaign = snapshot.campaign
+        _write_table(os.path.join(target, "campaign.arrow"), campaign.df)
+        _write_table(os.path.join(target, "cube.arrow"), campaign.cube)
+        _write_table(os.path.join(target, "amazon.arrow"), snapshot.amazon_hourly)
+        _write_index(target, "row_index", campaign.row_index)
+        _write_index(target, "cube_index", campaign.cube_index)
+        meta = {"campaign_column": campaign.campaign_column, "loaded_at": snapshot.loaded_at}
+        with open(os.path.join(target, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+        previous = self.current_version()
+        tmp = os.path.join(self.directory, CURRENT + ".part")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(tmp, os.path.join(self.directory, CURRENT))
+
+        # Keep the previous version for readers that are still attaching to it.
+        for name in os.listdir(self.directory):
+            if name.startswith("v") and name not in (version, previous):
+                shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+        return version
+
+    def attach(self, version):
+        """Memory-map a published version as a :class:`DatasetSnapshot`."""
+        source = os.path.join(self.directory, version)
+        with open(os.path.join(source, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        df = _read_table(os.path.join(source, "campaign.arrow"))
+        cube = _read_table(os.path.join(source, "cube.arrow"))
+        campaign_column = meta["campaign_column"]
+        campaign = CampaignData(
+            df=df,
+            campaign_column=campaign_column,
+            cube=cube,
+            row_index=_read_index(source, "row_index", df[campaign_column].cat.categories),
+            cube_index=_read_index(source, "cube_index", cube[campaign_column].cat.categories),
+        )
+        amazon_hourly = _read_table(os.path.join(source, "amazon.arrow"))
+        return DatasetSnapshot(campaign, amazon_hourly, meta["loaded_at"])
+
+
+def shared_loader(store, load, timeout=ATTACH_TIMEOUT_SECONDS):
+    """Wrap a snapshot loader (see ``refresher.DatasetRefresher``) for sharing.
+
+    The publisher runs ``load`` and publishes whatever changed; every process
+    then attaches to the current version if it differs from the one it holds.
+    Non-publishers wait up to ``timeout`` seconds for a first version. A
+    published snapshot must hold every frame, so all processes should require
+    all sources.
+    """
+    state = {"private": None, "attached": None}
+
+    def load_shared(previous, sources):
+        if store.try_acquire_publisher():
+            snapshot = load(state["private"], sources)
+            if snapshot is not state["private"]:
+                store.publish(snapshot)
+                state["private"] = snapshot
+
+        deadline = time.monotonic() + timeout
+        version = store.current_version()
+        while version is None and time.monotonic() < deadline:
+            time.sleep(0.5)
+            version = store.current_version()
+        if version is None:
+            raise TimeoutError(f"No dataset published in {store.directory} after {timeout}s")
+        if previous is not None and version == state["attached"]:
+            return previous
+
+        snapshot = store.attach(version)
+        state["attached"] = version
+        return snapshot
+
+    return load_shared
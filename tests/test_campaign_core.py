@@ -0,0 +1,163 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import csv_schema
+import data_sources
+from campaign_core import (
+    SelectionIndex,
+    add_hourly_deltas,
+    format_days,
+    load_amazon_csv,
+    load_campaign_csv,
+    prepare_campaign_data,
+    select_filtered,
+)
+from csv_schema import spend_schema
+from data_sources import load_incremental_frame
+
+
+def csv(text):
+    return io.BytesIO(text.encode("utf-8"))
+
+
+@pytest.fixture(params=["pyarrow", "c"])
+def engine(request, monkeypatch):
+    monkeypatch.setattr(csv_schema, "CSV_ENGINE", request.param)
+    return request.param
+
+
+def test_spend_rows_without_timestamp_are_dropped(engine):
+    df = load_campaign_csv(csv(
+        "timestamp,Campaign Name,Spend\n"
+        "2025-01-01 10:00:00,a,1\n"
+        ",a,2\n"
+        "2025-01-01 11:00:00,b,3\n"
+    ), spend_schema(["Spend"]))
+
+    assert list(format_days(df['date'])) == ["2025-01-01", "2025-01-01"]
+    assert list(df['hour_index']) == [10, 11]
+    assert list(df['Spend']) == [1, 3]
+
+
+def test_amazon_rows_without_date_are_dropped(engine):
+    amazon = load_amazon_csv(csv(
+        "Date,Hour,SP\n"
+        "2025-01-01,10,5\n"
+        ",11,7\n"
+    ))
+
+    assert list(format_days(amazon['date'])) == ["2025-01-01"]
+    assert list(amazon['SP']) == [5]
+
+
+def test_reports_without_any_timestamp_load_empty(engine):
+    df = load_campaign_csv(csv("timestamp,Campaign Name,Spend\n,a,2\n"), spend_schema(["Spend"]))
+    amazon = load_amazon_csv(csv("Date,Hour,SP\n,1,abc\n"))
+
+    assert len(df) == 0 and len(amazon) == 0
+
+
+def test_rows_without_campaign_are_not_a_campaign(engine):
+    df = load_campaign_csv(csv(
+        "timestamp,Campaign Name,Spend\n"
+        "2025-01-01 10:00:00,a,1\n"
+        "2025-01-01 10:00:00,,2\n"
+    ), spend_schema(["Spend"]))
+
+    assert list(df["Campaign Name"].cat.categories) == ["a"]
+    assert list(df['Spend']) == [1]
+
+
+ROLLUP_CSV = (
+    "timestamp,Campaign Name,Campaign Type,Spend,Budget\n"
+    "2025-01-01 10:00:00,a,SP,1,100\n"
+    "2025-01-01 10:30:00,a,SB,2,120\n"
+    "2025-01-01 10:15:00,a,SD,3,100\n"
+    "2025-01-01 11:00:00,a,SP,4,120\n"
+    "2025-01-01 10:00:00,b,SP,5,50\n"
+)
+
+
+def test_rollup_sums_metrics_and_keeps_the_latest_timestamp_and_largest_budget(engine):
+    df = load_campaign_csv(csv(ROLLUP_CSV), spend_schema(["Spend"]))
+
+    assert list(df["Campaign Name"]) == ["a", "a", "b"]
+    assert list(df['hour_index']) == [10, 11, 10]
+    assert list(df['Spend']) == [6, 4, 5]
+    assert list(df['Budget']) == [120, 120, 50]
+    assert list(df['timestamp']) == [
+        pd.Timestamp("2025-01-01 10:30"), pd.Timestamp("2025-01-01 11:00"), pd.Timestamp("2025-01-01 10:00")]
+    assert list(df["Campaign Type"]) == ["SP", "SP", "SP"]
+
+
+def test_rollup_feeds_the_cube_and_budget_columns(engine):
+    data = prepare_campaign_data(load_campaign_csv(csv(ROLLUP_CSV), spend_schema(["Spend"])), ["Spend"])
+
+    cube = data.cube[["Campaign Name", 'hour_index', 'Spend']].values.tolist()
+    assert cube == [["a", 10, 6], ["a", 11, 4], ["b", 10, 5]]
+    cube_slice, budget = select_filtered(data, ["a"], list(data.cube['date'].unique()))
+    assert list(cube_slice['Spend']) == [6, 4]
+    assert list(budget['cumulative_spend']) == [6, 10]
+    assert list(budget['budget_left']) == [114, 110]
+
+
+def test_rows_of_one_hour_split_across_appended_blocks_merge_in_the_cube(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_sources, "_tails", {})
+    report = tmp_path / "spend_master.csv"
+    header = "timestamp,Campaign Name,Spend\n"
+    first_block = "2025-01-01 10:00:00,a,1\n"
+    report.write_text(header + first_block)
+    parse = lambda source: load_campaign_csv(source, spend_schema(["Spend"]), "ISO8601")  # noqa: E731
+    load_incremental_frame(str(report), parse)
+
+    # A late ad group of the same hour, then the next hour.
+    report.write_text(header + first_block + "2025-01-01 10:00:00,a,2\n2025-01-01 11:00:00,a,4\n")
+    df = load_incremental_frame(str(report), parse)
+    data = prepare_campaign_data(df, ["Spend"])
+
+    assert len(df) == 3
+    assert list(data.cube['hour_index']) == [10, 11]
+    assert list(data.cube['Spend']) == [3, 4]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_selection_index_matches_an_isin_mask(seed):
+    rng = np.random.default_rng(seed)
+    names = [f"c{i}" for i in range(rng.integers(1, 12))]
+    rows = int(rng.integers(0, 400))
+    # Some rows without a campaign (code -1), days in no particular order.
+    campaign = pd.Categorical(rng.choice(names + [None], rows), categories=names)
+    frame = pd.DataFrame({"Campaign Name": campaign, 'date': rng.integers(20000, 20030, rows).astype('int32')})
+    index = SelectionIndex(frame, "Campaign Name")
+
+    campaigns = list(rng.choice(names + ["unknown"], int(rng.integers(0, len(names) + 2))))
+    dates = list(rng.integers(19995, 20035, int(rng.integers(0, 40))))
+    expected = np.flatnonzero(frame["Campaign Name"].isin(campaigns) & frame['date'].isin(dates))
+
+    assert np.array_equal(index.rows(campaigns, dates), expected)
+    restored = SelectionIndex.from_arrays(index.campaigns, index.to_arrays())
+    assert np.array_equal(restored.rows(campaigns, dates), expected)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_hourly_deltas_match_a_groupby_diff_per_metric(seed):
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({
+        "Campaign Name": pd.Categorical(rng.choice(["a", "b", "c"], 300)),
+        'date': rng.integers(20000, 20004, 300).astype('int32'),
+        'hour_index': rng.integers(0, 24, 300).astype('int8'),
+        'Spend': rng.random(300),
+        'Clicks': np.where(rng.random(300) < 0.1, np.nan, rng.integers(0, 50, 300)),
+    }).drop_duplicates(["Campaign Name", 'date', 'hour_index'])
+    groups = ["Campaign Name", 'date']
+
+    deltas = add_hourly_deltas(frame, groups, ['Spend', 'Clicks'])
+
+    expected = frame.sort_values(groups + ['hour_index']).reset_index(drop=True)
+    for metric in ['Spend', 'Clicks']:
+        diff = expected.groupby(groups, observed=True)[metric].diff()
+        pd.testing.assert_series_equal(
+            deltas[f"{metric} Δ"], diff.fillna(expected[metric]), check_names=False, check_dtype=False)
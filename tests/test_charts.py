@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from campaign_core import add_hourly_deltas
+from charts import MAX_CHART_ROWS, OTHER, TOP_CAMPAIGNS, campaign_chart_data, campaign_metrics_chart_data
+
+METRICS = ["Spend", "Impressions", "Clicks", "CTR", "Orders", "Sales", "ROAS", "CPC", "NTB orders", "vCTR"]
+
+
+def campaign_deltas(campaigns, days):
+    rng = np.random.default_rng(0)
+    cube = pd.DataFrame({
+        "Campaign Name": pd.Categorical([f"campaign_{i:02d}" for i in range(campaigns)]).repeat(days * 24),
+        "date": np.tile(np.repeat(np.arange(20089, 20089 + days, dtype="int32"), 24), campaigns),
+        "hour_index": np.tile(np.arange(24, dtype="int8"), campaigns * days),
+    })
+    for metric in METRICS:
+        cube[metric] = rng.random(len(cube)) * 100
+    return add_hourly_deltas(cube, ["Campaign Name", 'date'], METRICS)
+
+
+def test_single_campaign_chart_stays_within_the_row_budget():
+    chart_data = campaign_metrics_chart_data(campaign_deltas(60, 14), "Campaign Name", METRICS)
+
+    assert len(chart_data) <= MAX_CHART_ROWS
+    assert set(chart_data['metric']) == set(METRICS)
+
+
+def test_single_campaign_chart_keeps_the_campaigns_of_the_per_metric_charts():
+    deltas = campaign_deltas(60, 7)
+
+    chart_data = campaign_metrics_chart_data(deltas, "Campaign Name", METRICS)
+
+    assert len(chart_data) <= MAX_CHART_ROWS
+    for metric in METRICS:
+        shown = set(chart_data.loc[chart_data['metric'] == metric, "Campaign Name"])
+        alone = set(campaign_chart_data(deltas, "Campaign Name", metric)["Campaign Name"])
+        assert shown == alone
+        assert len(shown) == TOP_CAMPAIGNS + 1 and OTHER in shown
+    assert chart_data.attrs['fewer_campaigns'] == []
+
+
+def test_single_campaign_chart_folds_campaigns_only_when_series_cannot_fit():
+    chart_data = campaign_metrics_chart_data(campaign_deltas(60, 30), "Campaign Name", METRICS)
+
+    assert len(chart_data) <= MAX_CHART_ROWS
+    assert chart_data.attrs['fewer_campaigns'] == METRICS
+    assert chart_data.groupby('metric', observed=True)["Campaign Name"].nunique().min() > 2
@@ -0,0 +1,287 @@
+import email.utils
+import hashlib
+import http.server
+import io
+import pathlib
+import threading
+
+import pandas as pd
+import pytest
+
+import columnar_cache
+import csv_schema
+import data_sources
+from campaign_core import load_campaign_csv
+from csv_schema import spend_schema
+from data_sources import _append, _read_range, fetch, load_incremental_frame, load_remote_frame
+
+SPEND_CSV = (
+    "timestamp,Campaign Name,Spend,Clicks\n"
+    "2025-01-01 10:00:00,a,1,10\n"
+    "2025-01-01 11:00:00,a,2,20\n"
+)
+
+
+class ReportServer(http.server.ThreadingHTTPServer):
+    """Serves ``files`` (path -> bytes) with ETag / Last-Modified validators.
+
+    Conditional requests for an unchanged file get a 304. Range requests get
+    a 206, or a 416 past the end of the file, unless ``honor_range`` is off.
+    """
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _ReportHandler)
+        self.files = {}
+        self.honor_range = True
+        self.requests = []  # (path, request headers, status)
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.server_port}{path}"
+
+
+class _ReportHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = self.server.files[self.path]
+        etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+        status, payload, headers = 200, body, {"ETag": etag, "Last-Modified": email.utils.formatdate(usegmt=True)}
+        byte_range = self.headers.get("Range")
+        if self.headers.get("If-None-Match") == etag:
+            status, payload = 304, b""
+        elif byte_range and self.server.honor_range:
+            first, _, last = byte_range[len("bytes="):].partition("-")
+            first, last = int(first), int(last) if last else len(body) - 1
+            if first >= len(body):
+                status, payload = 416, b""
+                headers["Content-Range"] = f"bytes */{len(body)}"
+            else:
+                status, payload = 206, body[first:last + 1]
+                headers["Content-Range"] = f"bytes {first}-{first + len(payload) - 1}/{len(body)}"
+        self.server.requests.append((self.path, dict(self.headers), status))
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ReportServer()
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return str(tmp_path / "cache")
+
+
+@pytest.fixture(autouse=True)
+def fresh_process_state(monkeypatch):
+    # The in-process frame caches outlive a test; start each one empty.
+    monkeypatch.setattr(data_sources, "_frames", {})
+    monkeypatch.setattr(data_sources, "_tails", {})
+
+
+def read_csv(source):
+    return pd.read_csv(source, parse_dates=['timestamp'])
+
+
+def read_spend_csv(source):
+    # The dashboard's own parser: pinned formats, rollup and categorical keys.
+    return load_campaign_csv(source, spend_schema(["Spend"]), "ISO8601")
+
+
+class CountingParse:
+    """A CSV parser that records how many rows each call parsed."""
+
+    def __init__(self, read=read_csv):
+        self.read = read
+        self.rows = []
+
+    @property
+    def calls(self):
+        return len(self.rows)
+
+    def __call__(self, source):
+        frame = self.read(source)
+        self.rows.append(len(frame))
+        return frame
+
+
+@pytest.fixture(params=[read_csv, read_spend_csv], ids=["read_csv", "load_campaign_csv"])
+def parse(request):
+    return CountingParse(request.param)
+
+
+def test_fetch_revalidates_with_the_saved_validators(server, cache_dir):
+    server.files["/report.csv"] = SPEND_CSV.encode()
+
+    first = fetch(server.url("/report.csv"), cache_dir)
+    second = fetch(server.url("/report.csv"), cache_dir)
+
+    assert not first.not_modified and second.not_modified
+    assert second.path == first.path and second.validators == first.validators
+    assert pathlib.Path(second.path).read_text() == SPEND_CSV
+    assert [status for _, _, status in server.requests] == [200, 304]
+    assert server.requests[1][1]["If-None-Match"] == first.etag
+
+
+def test_fetch_downloads_a_changed_report(server, cache_dir):
+    server.files["/report.csv"] = SPEND_CSV.encode()
+    fetch(server.url("/report.csv"), cache_dir)
+    server.files["/report.csv"] = (SPEND_CSV + "2025-01-01 12:00:00,b,3,30\n").encode()
+
+    result = fetch(server.url("/report.csv"), cache_dir)
+
+    assert not result.not_modified
+    assert pathlib.Path(result.path).read_text().endswith("b,3,30\n")
+
+
+def test_unchanged_report_reuses_the_parsed_frame(server, cache_dir):
+    server.files["/report.csv"] = SPEND_CSV.encode()
+    parse = CountingParse()
+
+    first = load_remote_frame(server.url("/report.csv"), parse, cache_dir)
+    second = load_remote_frame(server.url("/report.csv"), parse, cache_dir)
+
+    assert second is first
+    assert parse.calls == 1
+    assert server.requests[-1][2] == 304
+
+
+@pytest.mark.skipif(columnar_cache.feather is None, reason="needs pyarrow")
+def test_columnar_cache_is_keyed_on_the_parse_configuration(tmp_path, cache_dir):
+    report = tmp_path / "spend_master.csv"
+    report.write_text(SPEND_CSV)
+    url = pathlib.Path(report).as_uri()
+
+    def load(metrics):
+        schema = spend_schema(metrics)
+        return load_remote_frame(url, lambda path: load_campaign_csv(path, schema), cache_dir, parse_key=schema.key())
+
+    assert "Clicks" not in load(["Spend"]).columns
+    assert "Clicks" in load(["Spend", "Clicks"]).columns
+    assert "Clicks" not in load(["Spend"]).columns
+
+
+HEADER = "timestamp,Campaign Name,Spend\n"
+ROWS = [f"2025-01-01 {hour:02d}:00:00,a,{hour}\n" for hour in range(6)]
+
+
+@pytest.fixture(params=["path", "url"])
+def appendable(request, tmp_path, server):
+    """An append-only report as a local file or served over HTTP, with a writer."""
+    path = tmp_path / "spend_master.csv"
+
+    def write(text):
+        path.write_text(text)
+        server.files["/spend_master.csv"] = text.encode()
+
+    write("")
+    return (str(path) if request.param == "path" else server.url("/spend_master.csv")), write
+
+
+def test_incremental_load_parses_only_appended_rows(appendable, parse):
+    source, write = appendable
+    write(HEADER + "".join(ROWS[:2]))
+    load_incremental_frame(source, parse)
+
+    write(HEADER + "".join(ROWS[:4]))
+    frame = load_incremental_frame(source, parse)
+
+    assert list(frame['Spend']) == [0, 1, 2, 3]
+    assert parse.rows == [2, 2]
+
+
+@pytest.mark.parametrize("partial", [
+    "2025-01-01 02",  # no campaign
+    "2025-01-0",  # not a timestamp yet
+    "2025-01-01 02:00:00,a",  # no value
+])
+def test_partial_last_line_is_read_once_complete(appendable, parse, partial):
+    source, write = appendable
+    write(HEADER + "".join(ROWS[:2]) + partial)
+
+    frame = load_incremental_frame(source, parse)
+    assert list(frame['Spend']) == [0, 1]
+
+    write(HEADER + "".join(ROWS[:3]))
+    frame = load_incremental_frame(source, parse)
+    assert list(frame['Spend']) == [0, 1, 2]
+    assert parse.rows == [2, 1]
+
+
+def test_truncated_report_is_reloaded_in_full(appendable, parse):
+    source, write = appendable
+    write(HEADER + "".join(ROWS[:4]))
+    load_incremental_frame(source, parse)
+
+    write(HEADER + ROWS[5])
+    frame = load_incremental_frame(source, parse)
+
+    assert list(frame['Spend']) == [5]
+    assert parse.rows == [4, 1]
+
+
+def test_appending_a_block_without_categories_keeps_the_categorical(monkeypatch):
+    monkeypatch.setattr(csv_schema, "CSV_ENGINE", "c")
+    frame = read_spend_csv(io.BytesIO((HEADER + ROWS[0]).encode()))
+    empty = read_spend_csv(io.BytesIO((HEADER + "2025-01-01 01:00:00,,1\n").encode()))
+
+    combined = _append(frame, empty)
+
+    assert isinstance(combined["Campaign Name"].dtype, pd.CategoricalDtype)
+    assert list(combined["Campaign Name"].cat.categories) == ["a"]
+
+
+def test_rows_older_than_the_last_timestamp_force_a_reload(appendable):
+    source, write = appendable
+    parse = CountingParse()
+    write(HEADER + ROWS[3])
+    load_incremental_frame(source, parse)
+
+    write(HEADER + ROWS[3] + ROWS[1])
+    frame = load_incremental_frame(source, parse)
+
+    assert list(frame['Spend']) == [3, 1]
+    assert parse.rows == [1, 1, 2]
+
+
+def test_read_range_over_http(server):
+    server.files["/report.csv"] = b"0123456789"
+    url = server.url("/report.csv")
+
+    assert _read_range(url, 2, 4) == b"234"
+    assert _read_range(url, 7) == b"789"
+    assert _read_range(url, 10) is None
+    assert [status for _, _, status in server.requests] == [206, 206, 416]
+
+
+def test_read_range_is_none_when_the_server_ignores_ranges(server):
+    server.files["/report.csv"] = b"0123456789"
+    server.honor_range = False
+
+    assert _read_range(server.url("/report.csv"), 2, 4) is None
+
+
+def test_incremental_load_over_http_falls_back_without_ranges(server):
+    server.files["/spend_master.csv"] = (HEADER + "".join(ROWS[:2])).encode()
+    url = server.url("/spend_master.csv")
+    parse = CountingParse()
+    load_incremental_frame(url, parse)
+
+    server.honor_range = False
+    server.files["/spend_master.csv"] = (HEADER + "".join(ROWS[:3])).encode()
+    frame = load_incremental_frame(url, parse)
+
+    assert list(frame['Spend']) == [0, 1, 2]
+    assert parse.rows == [2, 3]
@@ -0,0 +1,61 @@
+import pytest
+
+from refresher import DatasetRefresher, snapshot_of
+
+
+class FakeLoad:
+    """A snapshot loader that records which sources each call loaded."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, previous, sources):
+        self.calls.append(set(sources))
+        campaign = previous.campaign if previous is not None else None
+        amazon_hourly = previous.amazon_hourly if previous is not None else None
+        if "campaign" in sources and campaign is None:
+            campaign = "campaign frame"
+        if "amazon" in sources and amazon_hourly is None:
+            amazon_hourly = "amazon frame"
+        return snapshot_of(campaign, amazon_hourly, previous)
+
+
+def test_only_required_sources_are_loaded():
+    load = FakeLoad()
+    refresher = DatasetRefresher(load, interval=3600)
+    try:
+        snapshot = refresher.require({"campaign"})
+        assert load.calls == [{"campaign"}]
+        assert snapshot.campaign == "campaign frame" and snapshot.amazon_hourly is None
+
+        assert refresher.require({"campaign"}) is snapshot
+        assert load.calls == [{"campaign"}]
+
+        snapshot = refresher.require({"amazon"})
+        assert load.calls == [{"campaign"}, {"campaign", "amazon"}]
+        assert snapshot.amazon_hourly == "amazon frame"
+
+        refresher.refresh()
+        assert load.calls[-1] == {"campaign", "amazon"}
+    finally:
+        refresher.stop()
+
+
+def test_a_failed_first_load_is_retried():
+    load = FakeLoad()
+    failures = [OSError("report host unreachable")]
+
+    def flaky_load(previous, sources):
+        if failures:
+            raise failures.pop()
+        return load(previous, sources)
+
+    refresher = DatasetRefresher(flaky_load, interval=3600)
+    try:
+        with pytest.raises(OSError):
+            refresher.require({"campaign"})
+        assert refresher.snapshot is None
+
+        assert refresher.require({"campaign"}).campaign == "campaign frame"
+    finally:
+        refresher.stop()
@@ -0,0 +1,91 @@
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from campaign_core import load_amazon_csv, load_campaign_csv, prepare_campaign_data, select_filtered  # noqa: E402
+from csv_schema import spend_schema  # noqa: E402
+from refresher import snapshot_of  # noqa: E402
+from shared_dataset import SharedDataset, shared_loader  # noqa: E402
+
+SPEND_CSV = (
+    "timestamp,Campaign Name,Spend,Budget\n"
+    "2025-01-01 10:00:00,a,1,100\n"
+    "2025-01-01 11:00:00,a,2,100\n"
+    "2025-01-01 10:00:00,b,3,50\n"
+    "2025-01-02 10:00:00,b,4,50\n"
+)
+AMAZON_CSV = "Date,Hour,SP\n2025-01-01,10,5\n2025-01-01,11,7\n"
+
+
+def make_snapshot(spend_csv=SPEND_CSV, previous=None):
+    df = load_campaign_csv(io.BytesIO(spend_csv.encode()), spend_schema(["Spend"]))
+    campaign = prepare_campaign_data(df, ["Spend"])
+    return snapshot_of(campaign, load_amazon_csv(io.BytesIO(AMAZON_CSV.encode())), previous)
+
+
+class Loader:
+    """Hands out ``snapshot`` and counts the calls, like a refresher's load."""
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.calls = 0
+
+    def __call__(self, previous, sources):
+        self.calls += 1
+        return self.snapshot
+
+
+def versions(store):
+    return sorted(name for name in os.listdir(store.directory) if name.startswith("v"))
+
+
+def test_attached_snapshot_is_memory_mapped_and_selects_the_same_rows(tmp_path):
+    source = make_snapshot()
+    store = SharedDataset(str(tmp_path))
+
+    attached = shared_loader(store, Loader(source))(None, {"campaign", "amazon"})
+
+    for index in (attached.campaign.row_index, attached.campaign.cube_index):
+        assert all(isinstance(array, np.memmap) for array in index.to_arrays().values())
+    pd.testing.assert_frame_equal(attached.amazon_hourly, source.amazon_hourly, check_dtype=False)
+    for campaigns, dates in [(["a", "b"], [20089, 20090]), (["b"], [20090]), (["a", "zzz"], [20089, 1])]:
+        expected_cube, expected_budget = select_filtered(source.campaign, campaigns, dates)
+        cube, budget = select_filtered(attached.campaign, campaigns, dates)
+        pd.testing.assert_frame_equal(cube, expected_cube, check_dtype=False, check_categorical=False)
+        pd.testing.assert_frame_equal(budget, expected_budget, check_dtype=False)
+
+
+def test_unchanged_snapshot_is_not_republished(tmp_path):
+    store = SharedDataset(str(tmp_path))
+    load = shared_loader(store, Loader(make_snapshot()))
+
+    first = load(None, {"campaign", "amazon"})
+    version = store.current_version()
+    second = load(first, {"campaign", "amazon"})
+
+    assert second is first
+    assert store.current_version() == version
+    assert versions(store) == [version]
+
+
+def test_old_versions_are_pruned(tmp_path):
+    store = SharedDataset(str(tmp_path))
+    loader = Loader(make_snapshot())
+    load = shared_loader(store, loader)
+    snapshot = load(None, {"campaign", "amazon"})
+    published = [store.current_version()]
+
+    for hour in (12, 13):
+        loader.snapshot = make_snapshot(SPEND_CSV + f"2025-01-02 {hour}:00:00,a,9,100\n", loader.snapshot)
+        snapshot = load(snapshot, {"campaign", "amazon"})
+        published.append(store.current_version())
+
+    # The current version plus the previous one, for readers still attaching to it.
+    assert len(set(published)) == 3
+    assert versions(store) == sorted(published[1:])
+    assert len(snapshot.campaign.df) == 5
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from timestamps import parse_timestamps
+
+
+def test_categorical_values_are_parsed_per_category():
+    values = pd.Series(["2025-01-02 10:00:00", "2025-01-01 09:00:00", "2025-01-02 10:00:00"], dtype="category")
+
+    parsed = parse_timestamps(values, "ISO8601")
+
+    assert list(parsed) == [
+        pd.Timestamp("2025-01-02 10:00"), pd.Timestamp("2025-01-01 09:00"), pd.Timestamp("2025-01-02 10:00")]
+
+
+def test_object_values_are_parsed():
+    values = pd.Series(["2025-01-01 09:00:00", "2025-01-01 10:00:00"], dtype=object, index=[5, 7], name="timestamp")
+
+    parsed = parse_timestamps(values, "%Y-%m-%d %H:%M:%S")
+
+    assert list(parsed) == [pd.Timestamp("2025-01-01 09:00"), pd.Timestamp("2025-01-01 10:00")]
+    assert list(parsed.index) == [5, 7] and parsed.name == "timestamp"
+
+
+@pytest.mark.parametrize("dtype", ["category", object])
+def test_missing_values_become_nat(dtype):
+    values = pd.Series(["2025-01-01", None, "2025-01-02"], dtype=dtype)
+
+    parsed = parse_timestamps(values)
+
+    assert parsed[0] == pd.Timestamp("2025-01-01") and parsed[2] == pd.Timestamp("2025-01-02")
+    assert pd.isna(parsed[1])
+
+
+@pytest.mark.parametrize("values", [
+    pd.Series([None, None], dtype="category"),
+    pd.Series([None, np.nan], dtype=object),
+    pd.Series([], dtype=object),
+])
+def test_values_without_any_timestamp_become_all_nat(values):
+    parsed = parse_timestamps(values)
+
+    assert pd.api.types.is_datetime64_any_dtype(parsed.dtype)
+    assert len(parsed) == len(values) and parsed.isna().all()
+
+
+def test_non_iso_dates_fall_back_to_day_first():
+    values = pd.Series(["31-01-2025", "01-02-2025"], dtype="category")
+
+    parsed = parse_timestamps(values, dayfirst=True)
+
+    assert list(parsed) == [pd.Timestamp("2025-01-31"), pd.Timestamp("2025-02-01")]
+
+
+def test_iso_dates_are_not_read_day_first():
+    parsed = parse_timestamps(pd.Series(["2025-06-01"]), dayfirst=True)
+
+    assert parsed[0] == pd.Timestamp("2025-06-01")
+
+
+def test_a_pinned_format_that_does_not_match_raises():
+    with pytest.raises(ValueError):
+        parse_timestamps(pd.Series(["01/06/2025"]), "ISO8601")
@@ -0,0 +1,47 @@
+"""Timestamp parsing for the report CSVs.
+
+Each source has a pinned format, overridable through the environment, instead
+of per-file format guessing. Values are converted once per distinct string:
+an hourly report with millions of rows only has a few thousand distinct
+timestamps, and the parsed values are broadcast back through integer codes.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+# Any strftime format, or "ISO8601".
+SPEND_TIMESTAMP_FORMAT = os.environ.get("DASHBOARD_SPEND_TIMESTAMP_FORMAT", "ISO8601")
+# Unset: ISO dates, otherwise inferred day first (e.g. 31-01-2025).
+AMAZON_DATE_FORMAT = os.environ.get("DASHBOARD_AMAZON_DATE_FORMAT") or None
+
+
+def parse_timestamps(values, format=None, dayfirst=False):
+    """Parse a Series of timestamp strings, converting each distinct string once.
+
+    ``values`` may be Categorical (its categories are the distinct strings) or
+    plain strings. Missing values become NaT. Without a ``format``, ISO 8601
+    is tried first and the format is otherwise inferred, honouring
+    ``dayfirst`` (pandas would read 2025-06-01 as 2025-01-06 with dayfirst).
+    """
+    if pd.api.types.is_datetime64_any_dtype(values.dtype):
+        return values
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+    else:
+        codes, uniques = pd.factorize(values)
+
+    uniques = pd.Index(uniques)
+    if len(uniques) == 0:
+        # Nothing but missing values (or no rows): there is nothing to index into.
+        return pd.Series(pd.NaT, index=values.index, name=values.name, dtype='datetime64[ns]')
+    try:
+        parsed = pd.to_datetime(uniques, format=format or "ISO8601")
+    except ValueError:
+        if format is not None:
+            raise
+        parsed = pd.to_datetime(uniques, dayfirst=dayfirst)
+    parsed = parsed.to_numpy()
+    result = parsed[codes]
+    result[codes < 0] = np.datetime64('NaT')
+    return pd.Series(result, index=values.index, name=values.name)